@@ -5,6 +5,10 @@ from pathlib import Path
 import pandas as pd
 from collections import defaultdict
 
+# str.translate table deleting the control characters Excel rejects (everything below 0x20
+# except tab, newline and carriage return - this covers null bytes, vertical tab and form feed)
+EXCEL_ILLEGAL_CHARS = {code: None for code in range(0x20) if code not in (0x09, 0x0A, 0x0D)}
+
 def extract_document_name_from_pdf(pdf_path):
     """
     Extract document name from PDF.
@@ -206,22 +210,7 @@ def clean_text_for_excel(text):
     
     # Remove control characters except tab, newline, and carriage return
     # Excel doesn't allow control characters in the range 0x00-0x1F except 0x09, 0x0A, 0x0D
-    import unicodedata
-    
-    cleaned = []
-    for char in text:
-        code = ord(char)
-        # Keep printable characters, tab, newline, carriage return
-        if code >= 0x20 or code in (0x09, 0x0A, 0x0D):
-            cleaned.append(char)
-        # Skip other control characters
-    
-    result = ''.join(cleaned)
-    
-    # Also remove null bytes and other problematic characters
-    result = result.replace('\x00', '')
-    result = result.replace('\x0b', '')  # Vertical tab
-    result = result.replace('\x0c', '')  # Form feed
+    result = text.translate(EXCEL_ILLEGAL_CHARS)
     
     # Replace problematic Unicode characters that might not render
     result = result.encode('utf-8', errors='ignore').decode('utf-8', errors='ignore')
@@ -16,6 +16,31 @@ import time
 
 logger = logging.getLogger(__name__)
 
+# Instructions appended after the content in question-only mode
+_QUESTION_ONLY_INSTRUCTIONS = "Return ONLY the question text with no additional formatting, explanations, or JSON structure.\n"
+
+# Instructions appended after the content in Q&A pair mode
+_QA_PAIR_INSTRUCTIONS = (
+    "CRITICAL JSON FORMATTING REQUIREMENTS:\n"
+    "- You MUST respond with ONLY valid JSON - no other text, explanations, or formatting\n"
+    "- Do NOT use markdown code blocks (```json or ```)\n"
+    "- Do NOT include any text before or after the JSON object\n"
+    "- The JSON must contain exactly 2 keys: 'question' and 'answer'\n"
+    "- Properly escape all special characters (quotes, newlines, backslashes) within JSON strings\n"
+    "- Use double quotes for all JSON keys and string values\n"
+    "- Ensure the JSON is valid and parseable\n\n"
+    "CONTENT REQUIREMENTS:\n"
+    "- Question: Create a practical, technical question about industrial automation concepts\n"
+    "- Answer: Use the provided content as the answer, potentially enhanced with context\n"
+    "- Focus on industrial automation, control systems, or related technical domains\n"
+    "- Make the question general and domain-specific (not referencing the source document)\n"
+    "- Ensure the question is practical and applicable to real-world industrial scenarios\n"
+    "- Use clear, professional technical language\n\n"
+    "EXACT FORMAT REQUIRED:\n"
+    "{\"question\": \"Your question here\", \"answer\": \"Your answer here\"}\n\n"
+    "REMEMBER: Return ONLY the JSON object above with no additional text, formatting, or explanations.\n"
+)
+
 # Import system prompt configuration
 def get_current_system_prompt():
     """Get the current system prompt from environment variable"""
@@ -85,6 +110,15 @@ class ModelInfo:
     supports_streaming: bool = False
     cost_per_token: Optional[float] = None
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the dictionary the models endpoints return."""
+        return {
+            'name': self.name,
+            'display_name': self.display_name,
+            'description': self.description,
+            'max_tokens': self.max_tokens
+        }
+
 
 class BaseAIService(ABC):
     """Abstract base class for all AI service providers."""
@@ -128,13 +162,15 @@ class BaseAIService(ABC):
         pass
     
     @abstractmethod
-    async def generate_question(self, content: str, context: Optional[Dict[str, str]] = None) -> AIResponse:
+    async def generate_question(self, content: str, context: Optional[Dict[str, str]] = None,
+                                config: Optional[AIServiceConfig] = None) -> AIResponse:
         """
         Generate a training question for the given content.
 
         Args:
             content (str): The text content to generate a question for
             context (Dict[str, str], optional): Context including section hierarchy
+            config (AIServiceConfig, optional): Per-call configuration overriding self.config
 
         Returns:
             AIResponse: Generated question or error
@@ -143,7 +179,8 @@ class BaseAIService(ABC):
 
     async def generate_question_answer_pair(self, content: str, context: Optional[Dict[str, str]] = None,
                                            system_prompt: Optional[str] = None,
-                                           generation_mode: str = 'qa_pair') -> AIResponse:
+                                           generation_mode: str = 'qa_pair',
+                                           config: Optional[AIServiceConfig] = None) -> AIResponse:
         """
         Generate a question-answer pair for the given content with JSON output.
 
@@ -152,13 +189,15 @@ class BaseAIService(ABC):
             context (Dict[str, str], optional): Hierarchical context
             system_prompt (str, optional): Custom system prompt to override default
             generation_mode (str): Mode for generation ('qa_pair' or 'question_only')
+            config (AIServiceConfig, optional): Per-call configuration overriding self.config
+                (model and sampling parameters) without mutating the shared service
 
         Returns:
             AIResponse: Generated question-answer pair as JSON or error
         """
         # Default implementation calls generate_question for backward compatibility
         # Subclasses should override this method for JSON Q&A generation
-        return await self.generate_question(content, context)
+        return await self.generate_question(content, context, config)
     
     @abstractmethod
     async def get_available_models(self) -> List[ModelInfo]:
@@ -180,12 +219,14 @@ class BaseAIService(ABC):
         """
         pass
     
-    async def generate_questions_batch(self, content_list: List[Dict]) -> List[Dict]:
+    async def generate_questions_batch(self, content_list: List[Dict],
+                                       config: Optional[AIServiceConfig] = None) -> List[Dict]:
         """
         Generate questions for a batch of content items.
         
         Args:
             content_list (List[Dict]): List of content dictionaries with hierarchy and content
+            config (AIServiceConfig, optional): Per-call configuration overriding self.config
             
         Returns:
             List[Dict]: List of dictionaries with original content plus generated questions
@@ -203,7 +244,7 @@ class BaseAIService(ABC):
                 'subsubsubsection': item.get('subsubsubsection', '')
             }
             
-            response = await self.generate_question(content, context)
+            response = await self.generate_question(content, context, config)
             
             # Create result item
             result_item = item.copy()
@@ -234,62 +275,34 @@ class BaseAIService(ABC):
             str: Formatted prompt
         """
         # No validation - just use system prompt if provided, otherwise continue without it
-
         if generation_mode == 'question_only':
             # Question-only mode: simpler prompt for just generating a question
-            if system_prompt and system_prompt.strip():
-                prompt = f"{system_prompt}\n\nGenerate a question based on the following content.\n\n"
-            else:
-                prompt = "Generate a question based on the following content.\n\n"
+            task = "Generate a question based on the following content.\n\n"
+            instructions = _QUESTION_ONLY_INSTRUCTIONS
+        else:
+            # Q&A pair mode: full JSON prompt
+            task = "Generate a question-answer pair based on the following content.\n\n"
+            instructions = _QA_PAIR_INSTRUCTIONS
 
-            if context:
-                hierarchy_parts = []
-                for level, value in context.items():
-                    if value and value.strip():
-                        hierarchy_parts.append(f"{level}: {value}")
+        # Collect the parts and join once, rather than re-copying the growing prompt per line
+        parts = []
+        if system_prompt and system_prompt.strip():
+            parts.append(f"{system_prompt}\n\n")
+        parts.append(task)
 
-                if hierarchy_parts:
-                    prompt += f"Context: {' > '.join(hierarchy_parts)}\n\n"
+        if context:
+            hierarchy_parts = []
+            for level, value in context.items():
+                if value and value.strip():
+                    hierarchy_parts.append(f"{level}: {value}")
 
-            prompt += f"Content: {content}\n\n"
-            prompt += "Return ONLY the question text with no additional formatting, explanations, or JSON structure.\n"
-        else:
-            # Q&A pair mode: full JSON prompt
-            if system_prompt and system_prompt.strip():
-                prompt = f"{system_prompt}\n\nGenerate a question-answer pair based on the following content.\n\n"
-            else:
-                prompt = "Generate a question-answer pair based on the following content.\n\n"
-
-            if context:
-                hierarchy_parts = []
-                for level, value in context.items():
-                    if value and value.strip():
-                        hierarchy_parts.append(f"{level}: {value}")
-
-                if hierarchy_parts:
-                    prompt += f"Context: {' > '.join(hierarchy_parts)}\n\n"
-
-            prompt += f"Content: {content}\n\n"
-            prompt += "CRITICAL JSON FORMATTING REQUIREMENTS:\n"
-            prompt += "- You MUST respond with ONLY valid JSON - no other text, explanations, or formatting\n"
-            prompt += "- Do NOT use markdown code blocks (```json or ```)\n"
-            prompt += "- Do NOT include any text before or after the JSON object\n"
-            prompt += "- The JSON must contain exactly 2 keys: 'question' and 'answer'\n"
-            prompt += "- Properly escape all special characters (quotes, newlines, backslashes) within JSON strings\n"
-            prompt += "- Use double quotes for all JSON keys and string values\n"
-            prompt += "- Ensure the JSON is valid and parseable\n\n"
-            prompt += "CONTENT REQUIREMENTS:\n"
-            prompt += "- Question: Create a practical, technical question about industrial automation concepts\n"
-            prompt += "- Answer: Use the provided content as the answer, potentially enhanced with context\n"
-            prompt += "- Focus on industrial automation, control systems, or related technical domains\n"
-            prompt += "- Make the question general and domain-specific (not referencing the source document)\n"
-            prompt += "- Ensure the question is practical and applicable to real-world industrial scenarios\n"
-            prompt += "- Use clear, professional technical language\n\n"
-            prompt += "EXACT FORMAT REQUIRED:\n"
-            prompt += "{\"question\": \"Your question here\", \"answer\": \"Your answer here\"}\n\n"
-            prompt += "REMEMBER: Return ONLY the JSON object above with no additional text, formatting, or explanations.\n"
-
-        return prompt
+            if hierarchy_parts:
+                parts.append(f"Context: {' > '.join(hierarchy_parts)}\n\n")
+
+        parts.append(f"Content: {content}\n\n")
+        parts.append(instructions)
+
+        return ''.join(parts)
 
     def _extract_json_from_text(self, text: str) -> Optional[str]:
         """
@@ -10,7 +10,7 @@ import os
 import logging
 import asyncio
 from typing import List, Dict, Optional, Tuple, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import json
 
 from ai_service_base import (
@@ -41,6 +41,10 @@ class AIServiceManager:
         self._primary_provider: Optional[AIProviderType] = None
         self._fallback_order: List[AIProviderType] = []
         self._provider_status: Dict[AIProviderType, ProviderStatus] = {}
+        # Bumped whenever a provider's status, model list or the primary provider changes
+        self._status_version = 0
+        self._provider_payload_cache: Optional[Tuple[int, Dict[str, Dict]]] = None
+        self._models_payload_cache: Optional[Tuple[int, Dict[str, List[Dict]]]] = None
         
     async def initialize_providers(self, configs: Dict[AIProviderType, AIServiceConfig]) -> Dict[AIProviderType, bool]:
         """
@@ -66,6 +70,7 @@ class AIServiceManager:
                         status=AIServiceStatus.AVAILABLE,
                         available_models=await service.get_available_models()
                     )
+                    self._mark_status_changed()
                     logger.info(f"Successfully initialized {provider_type.value}")
                 else:
                     self._provider_status[provider_type] = ProviderStatus(
@@ -74,6 +79,7 @@ class AIServiceManager:
                         available_models=[],
                         last_error=service.last_error
                     )
+                    self._mark_status_changed()
                     logger.error(f"Failed to initialize {provider_type.value}: {service.last_error}")
                 
                 results[provider_type] = success
@@ -86,6 +92,7 @@ class AIServiceManager:
                     available_models=[],
                     last_error=str(e)
                 )
+                self._mark_status_changed()
                 results[provider_type] = False
         
         # Set primary provider and fallback order
@@ -143,6 +150,7 @@ class AIServiceManager:
         for provider in priority_order:
             if provider in providers_to_consider:
                 self._primary_provider = provider
+                self._mark_status_changed()
                 break
 
         # Set fallback order based on health and priority
@@ -217,17 +225,14 @@ class AIServiceManager:
             try:
                 logger.info(f"Attempting question generation with {provider_type.value}")
 
-                # Temporarily set the preferred model if specified
-                original_model = service.config.model_name
+                # Pass the preferred model in a per-call copy of the configuration instead of
+                # mutating the shared service, which concurrent requests also use
+                call_config = None
                 if preferred_model:
-                    service.config.model_name = preferred_model
+                    call_config = replace(service.config, model_name=preferred_model)
                     logger.info(f"Using model: {preferred_model}")
 
-                try:
-                    response = await service.generate_question(content, context)
-                finally:
-                    # Restore original model
-                    service.config.model_name = original_model
+                response = await service.generate_question(content, context, call_config)
 
                 last_provider = provider_type
 
@@ -282,6 +287,7 @@ class AIServiceManager:
                 if provider_type in self._provider_status:
                     self._provider_status[provider_type].status = AIServiceStatus.ERROR
                     self._provider_status[provider_type].last_error = str(e)
+                    self._mark_status_changed()
 
                 # If error is critical or shouldn't fallback, stop trying
                 if error_info.severity == ErrorSeverity.CRITICAL or not error_info.should_fallback:
@@ -370,77 +376,64 @@ class AIServiceManager:
             try:
                 logger.info(f"Attempting Q&A generation with {provider_type.value}")
 
-                # Temporarily override configuration parameters
-                original_model = service.config.model_name
-                original_temperature = service.config.temperature
-                original_max_tokens = service.config.max_tokens
-                original_top_p = service.config.top_p
+                # Apply per-call overrides to a copy of the configuration so concurrent
+                # requests never observe each other's model or sampling parameters
+                overrides = {}
 
                 if preferred_model:
-                    service.config.model_name = preferred_model
+                    overrides['model_name'] = preferred_model
                     logger.info(f"Using model: {preferred_model}")
 
                 if temperature is not None:
-                    service.config.temperature = temperature
+                    overrides['temperature'] = temperature
                     logger.info(f"Using temperature: {temperature}")
 
                 if max_tokens is not None:
-                    service.config.max_tokens = max_tokens
+                    overrides['max_tokens'] = max_tokens
                     logger.info(f"Using max_tokens: {max_tokens}")
 
                 if top_p is not None:
-                    service.config.top_p = top_p
+                    overrides['top_p'] = top_p
                     logger.info(f"Using top_p: {top_p}")
 
-                try:
-                    # DEBUG: Print provider and content info
-                    print(f"\n🚀 AI SERVICE MANAGER DEBUG:")
-                    print(f"   Provider: {provider_type.value}")
-                    print(f"   Model: {preferred_model or 'default'}")
-                    print(f"   Generation Mode: {generation_mode}")
-                    print(f"   Content length: {len(content)}")
-                    print(f"   Content preview: {repr(content[:100])}")
-                    print(f"   Context: {context}")
-                    print("-" * 50)
-
-                    response = await service.generate_question_answer_pair(content, context, system_prompt, generation_mode)
-
-                    # DEBUG: Print response summary
-                    print(f"\n📤 AI SERVICE MANAGER RESPONSE:")
-                    print(f"   Provider: {provider_type.value}")
-                    print(f"   Success: {response.success}")
-                    print(f"   Content type: {type(response.content)}")
-                    print(f"   Content length: {len(str(response.content)) if response.content else 0}")
-                    print(f"   Error: {response.error}")
-                    print("=" * 50)
-
-                    last_provider = provider_type
-
-                    if response.success:
-                        logger.info(f"✅ Q&A generation successful with {provider_type.value}")
-                        return response
-                    else:
-                        logger.warning(f"❌ Q&A generation failed with {provider_type.value}: {response.error}")
-                        last_error = response.error
-
-                        # If fallback is disabled, return immediately with provider-specific error
-                        if disable_fallback:
-                            return AIResponse(
-                                success=False,
-                                error=response.error,
-                                provider=provider_type,
-                                metadata={
-                                    'provider_display_name': self._get_provider_display_name(provider_type),
-                                    'disable_fallback': True
-                                }
-                            )
-
-                finally:
-                    # Restore original configuration parameters
-                    service.config.model_name = original_model
-                    service.config.temperature = original_temperature
-                    service.config.max_tokens = original_max_tokens
-                    service.config.top_p = original_top_p
+                call_config = replace(service.config, **overrides) if overrides else None
+
+                logger.debug(
+                    "🚀 Generating with provider=%s model=%s mode=%s content length %d, preview: %r, context=%s",
+                    provider_type.value, preferred_model or 'default', generation_mode,
+                    len(content), content[:100], context
+                )
+
+                response = await service.generate_question_answer_pair(
+                    content, context, system_prompt, generation_mode, call_config
+                )
+
+                logger.debug(
+                    "📤 Provider %s response: success=%s content type %s, length %d, error=%s",
+                    provider_type.value, response.success, type(response.content).__name__,
+                    len(str(response.content)) if response.content else 0, response.error
+                )
+
+                last_provider = provider_type
+
+                if response.success:
+                    logger.info(f"✅ Q&A generation successful with {provider_type.value}")
+                    return response
+                else:
+                    logger.warning(f"❌ Q&A generation failed with {provider_type.value}: {response.error}")
+                    last_error = response.error
+
+                    # If fallback is disabled, return immediately with provider-specific error
+                    if disable_fallback:
+                        return AIResponse(
+                            success=False,
+                            error=response.error,
+                            provider=provider_type,
+                            metadata={
+                                'provider_display_name': self._get_provider_display_name(provider_type),
+                                'disable_fallback': True
+                            }
+                        )
 
             except Exception as e:
                 error_msg = str(e)
@@ -496,18 +489,77 @@ class AIServiceManager:
         service = self._services[provider_to_use]
         logger.info(f"Using {provider_to_use.value} for batch question generation")
 
-        # Temporarily set the preferred model if specified
-        original_model = service.config.model_name
+        # Pass the preferred model per call rather than mutating the shared service config
+        call_config = None
         if preferred_model:
-            service.config.model_name = preferred_model
+            call_config = replace(service.config, model_name=preferred_model)
             logger.info(f"Using model: {preferred_model}")
 
-        try:
-            return await service.generate_questions_batch(content_list)
-        finally:
-            # Restore original model
-            service.config.model_name = original_model
+        return await service.generate_questions_batch(content_list, call_config)
     
+    def _mark_status_changed(self):
+        """
+        Invalidate the cached provider payloads after a provider status, model list or the
+        primary provider changed.
+
+        Must be called after the change is written, never before: a reader that sees the new
+        version while the old state is still in place would cache the old payload under it.
+        """
+        self._status_version += 1
+
+    @property
+    def status_version(self) -> int:
+        """Version stamp of the provider statuses, for callers caching derived data."""
+        return self._status_version
+
+    def get_cached_provider_payload(self) -> Dict[str, Dict]:
+        """
+        Get the per-provider fields of the provider listing, rebuilt only when provider state changes.
+
+        The returned dictionaries are shared between callers and must not be modified.
+
+        Returns:
+            Dict[str, Dict]: provider id -> available, isDefault, status, models and last_error
+        """
+        cached = self._provider_payload_cache
+        if cached and cached[0] == self._status_version:
+            return cached[1]
+
+        version = self._status_version
+        payload = {
+            provider_type.value: {
+                'available': status.status == AIServiceStatus.AVAILABLE,
+                'isDefault': self._primary_provider == provider_type,
+                'status': status.status.value,
+                'models': [model.name for model in status.available_models],
+                'last_error': status.last_error
+            }
+            for provider_type, status in self._provider_status.items()
+        }
+        self._provider_payload_cache = (version, payload)
+        return payload
+
+    def get_cached_models_payload(self) -> Dict[str, List[Dict]]:
+        """
+        Get the available models of every known provider, rebuilt only when provider state changes.
+
+        The returned lists are shared between callers and must not be modified.
+
+        Returns:
+            Dict[str, List[Dict]]: provider id -> model dictionaries
+        """
+        cached = self._models_payload_cache
+        if cached and cached[0] == self._status_version:
+            return cached[1]
+
+        version = self._status_version
+        payload = {
+            provider_type.value: [model.to_dict() for model in status.available_models]
+            for provider_type, status in self._provider_status.items()
+        }
+        self._models_payload_cache = (version, payload)
+        return payload
+
     def get_provider_status(self) -> Dict[str, Dict]:
         """Get status of all providers including health information."""
         status_dict = {}
@@ -516,15 +568,7 @@ class AIServiceManager:
             health_score = error_handler.get_provider_health(provider_type)
             status_dict[provider_type.value] = {
                 'status': status.status.value,
-                'available_models': [
-                    {
-                        'name': model.name,
-                        'display_name': model.display_name,
-                        'description': model.description,
-                        'max_tokens': model.max_tokens
-                    }
-                    for model in status.available_models
-                ],
+                'available_models': [model.to_dict() for model in status.available_models],
                 'last_error': status.last_error,
                 'last_check': status.last_check,
                 'health_score': health_score,
@@ -563,12 +607,14 @@ class AIServiceManager:
                 # Update status to available
                 if provider_type in self._provider_status:
                     self._provider_status[provider_type].status = AIServiceStatus.AVAILABLE
+                    self._mark_status_changed()
                 else:
                     self._provider_status[provider_type] = ProviderStatus(
                         provider_type=provider_type,
                         status=AIServiceStatus.AVAILABLE,
                         available_models=await service.get_available_models()
                     )
+                    self._mark_status_changed()
                 return True
             else:
                 # Create and initialize new service
@@ -582,6 +628,7 @@ class AIServiceManager:
                         status=AIServiceStatus.AVAILABLE,
                         available_models=await service.get_available_models()
                     )
+                    self._mark_status_changed()
                     logger.info(f"Successfully initialized {provider_type.value}")
                     return True
                 else:
@@ -591,6 +638,7 @@ class AIServiceManager:
                         available_models=[],
                         last_error=service.last_error
                     )
+                    self._mark_status_changed()
                     logger.error(f"Failed to initialize {provider_type.value}: {service.last_error}")
                     return False
 
@@ -602,6 +650,7 @@ class AIServiceManager:
                 available_models=[],
                 last_error=str(e)
             )
+            self._mark_status_changed()
             return False
     
     async def test_provider(self, provider_type: AIProviderType) -> AIResponse:
@@ -647,4 +696,5 @@ class AIServiceManager:
         self._services.clear()
         self._provider_status.clear()
         self._primary_provider = None
+        self._mark_status_changed()
         self._fallback_order.clear()
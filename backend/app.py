@@ -9,12 +9,19 @@ import tempfile
 import base64
 import logging
 import threading
+import atexit
 import time
 import json
-from datetime import datetime
+import queue
+import hashlib
+import random
+import concurrent.futures
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
@@ -22,14 +29,33 @@ import pandas as pd
 from openpyxl.styles import Font, Alignment, PatternFill
 import aiohttp
 
+# orjson is optional: a faster encoder for the frequently polled JSON endpoints
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
 # Import our document extractors and AI services
 from document_extractor import DocumentExtractor
 from dotenv import load_dotenv
 # AI service manager and configuration loader
 from ai_service_manager import AIServiceManager
-from ai_config_loader import load_all_ai_configs
+from ai_service_base import AIProviderType, AIServiceConfig, get_current_system_prompt
+from ai_config_loader import load_all_ai_configs, create_config_from_request_credentials
+from request_credentials import (
+    get_provider_credential,
+    extract_credentials_from_headers,
+    extract_all_credentials_from_headers,
+    sync_request_credentials_to_manager
+)
+from qa_cache import QACache, get_qa_cache
 import asyncio
 
+# Provider id (e.g. 'openai') -> AIProviderType, built once instead of scanning the enum per request
+_PROVIDER_TYPE_BY_ID = {pt.value: pt for pt in AIProviderType}
+
 # Load environment variables
 load_dotenv()
 # Force reload to pick up Azure OpenAI credentials
@@ -82,13 +108,189 @@ def extract_json_from_text(text: str) -> str:
 
     return None
 
+
+@dataclass
+class QGResult:
+    """Generation outcome for one item, referencing the input item instead of copying it"""
+    __slots__ = ('item', 'question', 'answer', 'provider_used')
+
+    item: dict
+    question: object
+    answer: object
+    provider_used: object
+
+    def to_dict(self):
+        """Merge the generated fields into a new copy of the input item"""
+        return {
+            **self.item,
+            'question': self.question,
+            'answer': self.answer,
+            'question_generated': self.question is not None,
+            'provider_used': self.provider_used
+        }
+
+
+# Upper bound on a provider's Retry-After, so one header cannot park a worker for hours
+MAX_RETRY_AFTER_SECONDS = 60
+
+
+def _parse_retry_after(value):
+    """
+    Parse a Retry-After header value into seconds.
+
+    Args:
+        value: Header value, either delay-seconds or an HTTP-date
+
+    Returns:
+        Optional[float]: Seconds to wait, clamped to [0, MAX_RETRY_AFTER_SECONDS], or None
+        if the value is neither form
+    """
+    value = str(value).strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            logger.debug("Ignoring unparseable Retry-After header: %r", value)
+            return None
+        if retry_at is None:
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+
+    if seconds != seconds:  # NaN
+        return None
+    return float(min(max(seconds, 0.0), MAX_RETRY_AFTER_SECONDS))
+
+
+def _retry_backoff_seconds(retry_attempt, error=None):
+    """
+    Jittered exponential backoff for a retry, honoring a provider's Retry-After header.
+
+    Args:
+        retry_attempt: Zero-based attempt number that just failed
+        error: Exception raised by the attempt, if any
+
+    Returns:
+        float: Seconds to wait before the next attempt
+    """
+    base = min(30, 2 ** retry_attempt)
+    wait_time = base / 2 + random.random() * base / 2
+
+    # Provider SDK errors expose the HTTP response headers either directly or on .response
+    headers = getattr(error, 'headers', None) or getattr(getattr(error, 'response', None), 'headers', None)
+    retry_after = headers.get('Retry-After') if hasattr(headers, 'get') else None
+    if retry_after is not None:
+        retry_after_seconds = _parse_retry_after(retry_after)
+        if retry_after_seconds is not None:
+            wait_time = max(wait_time, retry_after_seconds)
+
+    return wait_time
+
+
+def _parse_question_only(response, content):
+    """Question-only mode: the response is the question and the original content is the answer."""
+    return response.content, content
+
+
+def _parse_qa_pair(response, content):
+    """
+    Q&A pair mode: parse the JSON question-answer object out of an AI response.
+
+    Args:
+        response (AIResponse): Successful response whose content is a dict or a JSON string
+        content (str): Original content (unused, kept for a uniform parser signature)
+
+    Returns:
+        Tuple[Optional[str], Optional[str]]: (question, answer); the answer is empty when
+        the response does not contain a valid question-answer object
+    """
+    try:
+        logger.debug("🔄 Attempting JSON parsing...")
+
+        # First try direct parsing if it's already a dict
+        if isinstance(response.content, dict):
+            qa_data = response.content
+            logger.debug("✅ Response is already a dictionary")
+        elif isinstance(response.content, str):
+            # Try direct JSON parsing first
+            try:
+                qa_data = json.loads(response.content)
+                logger.debug("✅ Direct JSON parsing successful: %s", type(qa_data).__name__)
+            except json.JSONDecodeError:
+                # Use improved JSON extraction for malformed responses
+                logger.debug("Direct parsing failed, trying JSON extraction...")
+                json_str = extract_json_from_text(response.content)
+                if json_str:
+                    qa_data = json.loads(json_str)
+                    logger.debug("✅ Extracted JSON parsing successful: %s", type(qa_data).__name__)
+                else:
+                    raise json.JSONDecodeError("No valid JSON found", response.content, 0)
+        else:
+            raise TypeError(f"Unexpected response content type: {type(response.content)}")
+
+        logger.debug("📊 Parsed data: %r", qa_data)
+
+        if isinstance(qa_data, dict) and 'question' in qa_data and 'answer' in qa_data:
+            logger.debug("✅ Valid Q&A pair extracted")
+            return qa_data['question'], qa_data['answer']  # Only use parsed answer from JSON
+
+        # If the structure is wrong, leave answer empty
+        logger.debug("❌ Invalid Q&A structure - missing keys or wrong format")
+    except (json.JSONDecodeError, TypeError) as e:
+        # If JSON parsing fails, leave answer empty
+        logger.debug("❌ JSON parsing failed: %s", e)
+
+    return (response.content if response.content else None), ''
+
 app = Flask(__name__)
 CORS(app)  # Enable CORS for React frontend
 
+# Long-lived event loop on a daemon thread. Async work from request handlers is submitted
+# here so provider clients and connection pools survive across requests.
+background_loop = asyncio.new_event_loop()
+threading.Thread(target=background_loop.run_forever, name='ai-background-loop', daemon=True).start()
+
+
+def run_in_background_loop(coro, timeout=None):
+    """
+    Run a coroutine on the shared background event loop and wait for its result.
+
+    Args:
+        coro: Coroutine to run
+        timeout (float, optional): Seconds to wait before cancelling the coroutine
+
+    Returns:
+        The coroutine's result
+
+    Raises:
+        concurrent.futures.TimeoutError: If the coroutine did not finish within timeout
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, background_loop)
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+def dumps_json(obj):
+    """Serialize obj to JSON, using orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj)
+
+def ojsonify(obj, status=200):
+    """jsonify() replacement for hot endpoints, encoding with orjson when available"""
+    return Response(dumps_json(obj), status=status, mimetype='application/json')
+
 # Initialize AI services
 ai_service_manager = None
 ai_initialization_complete = False
 ai_initialization_lock = threading.Lock()
+# Set once initialization finishes so request handlers can block on it instead of polling
+ai_init_event = threading.Event()
 
 async def initialize_ai_services():
     """Initialize all AI services asynchronously."""
@@ -127,6 +329,7 @@ async def initialize_ai_services():
         # Mark initialization as complete regardless of success/failure
         with ai_initialization_lock:
             ai_initialization_complete = True
+        ai_init_event.set()
         logger.info("AI services initialization complete")
 
 # Initialize AI services in a separate thread to avoid blocking Flask startup
@@ -137,23 +340,19 @@ def init_ai_services_sync():
     # Clean up existing services before reinitializing (important for hot reload)
     if ai_service_manager:
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(ai_service_manager.cleanup())
-            loop.close()
+            run_in_background_loop(ai_service_manager.cleanup())
         except Exception as e:
             logger.warning(f"Error cleaning up existing AI services: {e}")
 
+    # Initialize on the background loop so the services' clients are bound to the loop that uses them
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(initialize_ai_services())
-        loop.close()
+        run_in_background_loop(initialize_ai_services())
     except Exception as e:
         logger.error(f"Failed to initialize AI services: {e}")
         # Mark as complete even on error
         with ai_initialization_lock:
             ai_initialization_complete = True
+        ai_init_event.set()
 
 # Start AI service initialization in background
 ai_init_thread = threading.Thread(target=init_ai_services_sync, daemon=True)
@@ -164,6 +363,10 @@ UPLOAD_FOLDER = tempfile.gettempdir()
 # Get supported extensions from DocumentExtractor
 ALLOWED_EXTENSIONS = DocumentExtractor.get_supported_extensions()
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+# Maximum number of items sent to the AI provider at the same time during question generation
+QUESTION_GENERATION_CONCURRENCY = max(1, int(os.getenv('QG_CONCURRENCY', '8')))
+# Log per-item progress only for every Nth item (the last item is always logged)
+QUESTION_GENERATION_LOG_EVERY_N = max(1, int(os.getenv('QG_LOG_EVERY_N', '1')))
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
@@ -346,6 +549,17 @@ def handle_file_too_large(_):
         'success': False
     }), 413
 
+@app.errorhandler(404)
+def handle_not_found(e):
+    """Answer the removed backend credential routes with 410 Gone; other misses use the general handler"""
+    if request.path.startswith('/api/credentials'):
+        return jsonify({
+            'success': False,
+            'error': 'Backend credential storage is disabled. Credentials are stored client-side only (browser localStorage).',
+            'message': '🔒 For security and user isolation, all API keys are stored in your browser only. Use the frontend API Key Configuration dialog.'
+        }), 410  # 410 Gone - endpoint is permanently disabled
+    return handle_general_error(e)
+
 @app.errorhandler(Exception)
 def handle_general_error(e):
     """Handle general errors"""
@@ -729,7 +943,6 @@ def download_qa_json():
 def get_system_prompt_endpoint():
     """Get current system prompt from environment variable"""
     try:
-        from ai_service_base import get_current_system_prompt
         system_prompt = get_current_system_prompt()
 
         # Return 200 even if empty - frontend will handle gracefully
@@ -751,7 +964,6 @@ def generate_system_prompt_endpoint():
     """Generate a custom system prompt based on user's use case description using selected AI provider and model"""
     try:
         # Sync credentials from request headers to credential manager (in-memory only)
-        from request_credentials import sync_request_credentials_to_manager
         sync_request_credentials_to_manager(request)
 
         data = request.json
@@ -773,8 +985,6 @@ def generate_system_prompt_endpoint():
 
         # Use the global AI service manager
         global ai_service_manager
-        from ai_service_base import AIProviderType
-        import asyncio
 
         # Check if AI service manager is initialized
         if not ai_service_manager:
@@ -838,17 +1048,15 @@ RULES:
 
 Generate the SHORT system prompt now:"""
 
+        # Get credentials from request headers here - the coroutine runs outside the request context
+        creds = extract_credentials_from_headers(request, provider_id) if provider_id else None
+
         async def generate():
             try:
                 # Ensure the requested provider is initialized with request credentials
                 if provider_id:
                     provider_type = AIProviderType(provider_id)
 
-                    # Get credentials from request headers
-                    from request_credentials import extract_credentials_from_headers
-                    from ai_service_base import AIServiceConfig
-
-                    creds = extract_credentials_from_headers(request, provider_id)
                     if creds:
                         # Create config from request credentials
                         # Only pass parameters that AIServiceConfig accepts
@@ -887,49 +1095,38 @@ Generate the SHORT system prompt now:"""
                 if not service:
                     return None, f"Service not found for {provider_type.value}"
 
-                # Set model temporarily
-                original_model = service.config.model_name
-                if model_name:
-                    service.config.model_name = model_name
-
-                try:
-                    # Check if service has generate_text_direct method (for bypassing system prompt requirement)
-                    if hasattr(service, 'generate_text_direct'):
-                        # Use generate_text_direct to bypass system prompt requirement
-                        # This is a meta-task: using AI to generate a system prompt
-                        response = await service.generate_text_direct(
-                            prompt=user_prompt,
-                            system_instruction=meta_system_prompt
-                        )
-                    else:
-                        # Fallback: Use generate_question_answer_pair with system prompt
-                        # (This will work for services that don't validate system prompt)
-                        response = await service.generate_question_answer_pair(
-                            content=user_prompt,
-                            context=None,
-                            system_prompt=meta_system_prompt,
-                            generation_mode='question_only'
-                        )
-
-                    if response and response.success:
-                        # The response content should be the generated system prompt
-                        return response.content, None
-                    else:
-                        return None, response.error if response else "Unknown error"
-                finally:
-                    service.config.model_name = original_model
+                # Check if service has generate_text_direct method (for bypassing system prompt requirement)
+                if hasattr(service, 'generate_text_direct'):
+                    # Use generate_text_direct to bypass system prompt requirement
+                    # This is a meta-task: using AI to generate a system prompt
+                    # The model is passed per call so the shared service config is never mutated
+                    response = await service.generate_text_direct(
+                        prompt=user_prompt,
+                        system_instruction=meta_system_prompt,
+                        model_name=model_name or None
+                    )
+                else:
+                    # Fallback: Use generate_question_answer_pair with system prompt
+                    # (This will work for services that don't validate system prompt)
+                    response = await service.generate_question_answer_pair(
+                        content=user_prompt,
+                        context=None,
+                        system_prompt=meta_system_prompt,
+                        generation_mode='question_only'
+                    )
+
+                if response and response.success:
+                    # The response content should be the generated system prompt
+                    return response.content, None
+                else:
+                    return None, response.error if response else "Unknown error"
 
             except Exception as e:
                 logger.error(f'Error in generation: {str(e)}', exc_info=True)
                 return None, str(e)
 
-        # Run async
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            result, error = loop.run_until_complete(generate())
-        finally:
-            loop.close()
+        # Run async on the shared background loop
+        result, error = run_in_background_loop(generate())
 
         if result:
             logger.info("✅ System prompt generated successfully")
@@ -989,11 +1186,9 @@ def generate_questions():
                 'success': False
             }), 400
 
-        # Process all data items
-        data_to_process = data
-        logger.info(f'📊 Processing all {len(data_to_process)} items')
+        logger.info(f'📊 Processing all {len(data)} items')
 
-        logger.info(f'🚀 Starting question generation for {len(data_to_process)} content items')
+        logger.info(f'🚀 Starting question generation for {len(data)} content items')
 
         # Use AI service manager if available
         if ai_service_manager:
@@ -1001,10 +1196,11 @@ def generate_questions():
 
             # Generate questions using the service manager
             async def generate_questions_async():
-                processed_results = []
+                # Every item is processed, so each slot is overwritten with its result
+                final_results = list(data)
                 successful_count = 0
 
-                for i, item in enumerate(data_to_process):
+                for i, item in enumerate(data):
                     content = item.get('content', '')
                     context = {
                         'section': item.get('section', ''),
@@ -1027,29 +1223,12 @@ def generate_questions():
                         result_item['error'] = response.error
                         result_item['provider_used'] = response.provider.value if response.provider else 'unknown'
 
-                    processed_results.append(result_item)
-
-                # Merge processed results back with original data
-                final_results = []
-                processed_dict = {item['id']: item for item in processed_results}
-
-                for original_item in data:
-                    if original_item['id'] in processed_dict:
-                        # Use the processed version with new question
-                        final_results.append(processed_dict[original_item['id']])
-                    else:
-                        # Keep the original item unchanged (already had a question)
-                        final_results.append(original_item)
+                    final_results[i] = result_item
 
                 return final_results, successful_count
 
-            # Run async generation
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                results, successful_count = loop.run_until_complete(generate_questions_async())
-            finally:
-                loop.close()
+            # Run async generation on the shared background loop
+            results, successful_count = run_in_background_loop(generate_questions_async())
 
             provider_used = 'ai_service_manager'
 
@@ -1059,7 +1238,7 @@ def generate_questions():
                 'success': False
             }), 503
 
-        logger.info(f'🎯 Question generation completed: {successful_count}/{len(data_to_process)} successful')
+        logger.info(f'🎯 Question generation completed: {successful_count}/{len(data)} successful')
 
         # Log the generated questions for debugging
         for i, item in enumerate(results):
@@ -1075,7 +1254,7 @@ def generate_questions():
             'data': results,
             'total_items': len(data),
             'successful_generations': successful_count,
-            'message': f'Generated {successful_count} new questions (processed {len(data_to_process)} items)',
+            'message': f'Generated {successful_count} new questions (processed {len(data)} items)',
             'provider_used': provider_used
         })
 
@@ -1102,6 +1281,40 @@ question_generation_progress = {
     'estimated_completion': None
 }
 
+# Open progress streams, one queue per connected client
+PROGRESS_STREAM_KEEPALIVE_SECONDS = 30
+PROGRESS_STREAM_MAX_PENDING = 1000
+_progress_subscribers = []
+_progress_subscribers_lock = threading.Lock()
+
+
+def publish_question_generation_progress(delta):
+    """Push a progress delta to every open progress stream"""
+    with _progress_subscribers_lock:
+        subscribers = list(_progress_subscribers)
+
+    for subscriber in subscribers:
+        try:
+            subscriber.put_nowait(delta)
+        except queue.Full:
+            # Slow client; it still gets later deltas and can resync from the snapshot endpoint
+            pass
+
+
+def _publish_progress_counts(**extra):
+    """Publish the current item counters plus any extra fields"""
+    publish_question_generation_progress({
+        'current_item': question_generation_progress['current_item'],
+        'total_items': question_generation_progress['total_items'],
+        'progress_percent': question_generation_progress['progress_percent'],
+        'successful_count': question_generation_progress['successful_count'],
+        'failed_count': question_generation_progress['failed_count'],
+        'retry_count': question_generation_progress['retry_count'],
+        'current_status': question_generation_progress['current_status'],
+        'is_generating': question_generation_progress['is_generating'],
+        **extra
+    })
+
 @app.route('/api/generate-questions-with-progress', methods=['POST'])
 def generate_questions_with_progress():
     """Generate training questions with real-time progress updates"""
@@ -1109,7 +1322,6 @@ def generate_questions_with_progress():
 
     try:
         # Sync credentials from request headers to credential manager (in-memory only)
-        from request_credentials import sync_request_credentials_to_manager
         sync_request_credentials_to_manager(request)
 
         # Check if any AI service is available
@@ -1130,6 +1342,8 @@ def generate_questions_with_progress():
         max_tokens = request.json.get('max_tokens', 300)
         top_p = request.json.get('top_p', 0.9)
         system_prompt = request.json.get('system_prompt')
+        # Set to false to always call the provider, e.g. to get a different pair at temperature > 0
+        use_cache = request.json.get('use_cache', True)
 
         # Validate required parameters
         if not data:
@@ -1184,17 +1398,10 @@ def generate_questions_with_progress():
             # Convert preferred_provider string to AIProviderType if specified
             preferred_provider_type = None
             if preferred_provider:
-                from ai_service_base import AIProviderType
-                for pt in AIProviderType:
-                    if pt.value == preferred_provider:
-                        preferred_provider_type = pt
-                        break
+                preferred_provider_type = _PROVIDER_TYPE_BY_ID.get(preferred_provider)
 
                 # Ensure the preferred provider is initialized with request credentials
                 if preferred_provider_type:
-                    from request_credentials import extract_credentials_from_headers
-                    from ai_service_base import AIServiceConfig
-
                     creds = extract_credentials_from_headers(request, preferred_provider)
                     if creds:
                         # Create config from request credentials
@@ -1210,24 +1417,19 @@ def generate_questions_with_progress():
                         # Ensure provider is initialized with these credentials
                         logger.info(f"🔧 Ensuring {preferred_provider} is initialized with request credentials")
 
-                        # Run async initialization in event loop
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        try:
-                            initialized = loop.run_until_complete(
-                                ai_service_manager.ensure_provider_initialized(preferred_provider_type, config)
-                            )
-                            if initialized:
-                                logger.info(f"✅ {preferred_provider} initialized successfully")
-                            else:
-                                logger.error(f"❌ Failed to initialize {preferred_provider}")
-                                if disable_fallback:
-                                    return jsonify({
-                                        'error': f'Failed to initialize {preferred_provider}. Please check your credentials.',
-                                        'success': False
-                                    }), 400
-                        finally:
-                            loop.close()
+                        # Initialize on the shared background loop that will also run generation
+                        initialized = run_in_background_loop(
+                            ai_service_manager.ensure_provider_initialized(preferred_provider_type, config)
+                        )
+                        if initialized:
+                            logger.info(f"✅ {preferred_provider} initialized successfully")
+                        else:
+                            logger.error(f"❌ Failed to initialize {preferred_provider}")
+                            if disable_fallback:
+                                return jsonify({
+                                    'error': f'Failed to initialize {preferred_provider}. Please check your credentials.',
+                                    'success': False
+                                }), 400
                     else:
                         logger.warning(f"⚠️ No credentials found in request headers for {preferred_provider}")
                         if disable_fallback:
@@ -1238,35 +1440,56 @@ def generate_questions_with_progress():
 
             async def generate_questions_with_progress_async():
                 nonlocal successful_count
-                processed_results = []
+                total_items = len(data_to_process)
+
+                # Pre-sized result list: each task writes its own slot, so results come back
+                # in input order without a re-sort or id-keyed merge pass
+                results = [None] * total_items
+
+                # Pick the response parser once instead of branching on the mode per item
+                parse_response = _parse_question_only if generation_mode == 'question_only' else _parse_qa_pair
+
+                # Everything besides the content and context that shapes the generated pair
+                qa_cache = get_qa_cache() if use_cache else None
+                cache_params = {
+                    'provider': preferred_provider,
+                    'model': preferred_model,
+                    'generation_mode': generation_mode,
+                    'system_prompt': system_prompt,
+                    'temperature': temperature,
+                    'max_tokens': max_tokens,
+                    'top_p': top_p
+                }
+
+                # Identical content and context within this run -> future of its (question, answer) pair (None if it failed),
+                # so duplicates wait for the first occurrence instead of calling the provider again
+                batch_cache = {}
+
+                async def process_item(i, item):
+                    """Generate the Q&A pair for one item, returning provider error info if generation must stop"""
+                    nonlocal successful_count
 
-                for i, item in enumerate(data_to_process):
-                    # Update progress - show current item being processed
-                    question_generation_progress['current_item'] = i + 1
                     question_generation_progress['current_status'] = 'processing'
 
-                    logger.info(f"📝 Processing item {i + 1}/{len(data_to_process)}...")
+                    log_item = (i + 1) % QUESTION_GENERATION_LOG_EVERY_N == 0 or i + 1 == total_items
+                    if log_item:
+                        logger.info("📝 Processing item %d/%d...", i + 1, total_items)
 
                     content = item.get('content', '')
-
-                    # DEBUG: Log content details
-                    logger.info(f"🔍 Content details for item {i + 1}:")
-                    logger.info(f"   Content length: {len(content)}")
-                    logger.info(f"   Content preview: {repr(content[:100]) if content else 'EMPTY'}")
+                    logger.debug("🔍 Item %d content length %d, preview: %r", i + 1, len(content), content[:100])
 
                     # Validate content length before processing
                     if not content or len(content.strip()) < 10:
-                        logger.warning(f"⚠️ Skipping item {i + 1}: Content too short (length: {len(content.strip()) if content else 0})")
+                        logger.warning("⚠️ Skipping item %d: Content too short (length: %d)", i + 1, len(content.strip()) if content else 0)
                         question_generation_progress['failed_count'] += 1
-                        question_generation_progress['progress_percent'] = int(((i + 1) / len(data_to_process)) * 100)
 
                         # Add failed result
-                        processed_results.append({
+                        results[i] = {
                             **item,
                             'question_generated': False,
                             'generation_error': f'Content too short for question generation (minimum 10 characters required, got {len(content.strip()) if content else 0})'
-                        })
-                        continue
+                        }
+                        return None
 
                     context = {
                         'section': item.get('section', ''),
@@ -1281,7 +1504,37 @@ def generate_questions_with_progress():
                     max_item_retries = 3
                     provider_used = None
 
-                    for retry_attempt in range(max_item_retries):
+                    # Reuse a previously generated pair for identical content and settings
+                    cache_key = None
+                    attempts = max_item_retries
+                    if qa_cache:
+                        cache_key = qa_cache.make_key(content, context, cache_params)
+                        # SQLite reads and commits block, so keep them off the shared event loop
+                        cached_pair = await asyncio.to_thread(qa_cache.get, cache_key)
+                        if cached_pair:
+                            question, answer = cached_pair
+                            provider_used = 'cache'
+                            attempts = 0
+                            if log_item:
+                                logger.info("♻️ Item %d: Reusing cached question-answer pair", i + 1)
+
+                    batch_future = None
+                    if attempts:
+                        # Same key as the persistent cache, so both agree on what counts as a duplicate
+                        batch_key = cache_key or QACache.make_key(content, context, cache_params)
+                        earlier_pair = batch_cache.get(batch_key)
+                        if earlier_pair is None:
+                            batch_future = batch_cache[batch_key] = asyncio.get_running_loop().create_future()
+                        else:
+                            batch_pair = await earlier_pair
+                            if batch_pair:
+                                question, answer = batch_pair
+                                provider_used = 'batch-cache'
+                                attempts = 0
+                                if log_item:
+                                    logger.info("♻️ Item %d: Reusing question-answer pair of identical content and context in this batch", i + 1)
+
+                    for retry_attempt in range(attempts):
                         try:
                             question_generation_progress['current_status'] = f'processing_attempt_{retry_attempt + 1}'
 
@@ -1291,96 +1544,28 @@ def generate_questions_with_progress():
                                 temperature, max_tokens, top_p, system_prompt, generation_mode
                             )
 
-                            # DEBUG: Print raw response for debugging
-                            print(f"\n🔍 DEBUG - Item {i + 1}, Attempt {retry_attempt + 1}")
-                            print(f"📤 Provider: {response.provider.value if response.provider else 'unknown'}")
-                            print(f"✅ Success: {response.success}")
-                            print(f"📝 Raw Response Content:")
-                            print(f"   Type: {type(response.content)}")
-                            print(f"   Length: {len(str(response.content)) if response.content else 0}")
-                            print(f"   Content: {repr(response.content)}")
-                            if response.error:
-                                print(f"❌ Error: {response.error}")
-                            print("-" * 80)
+                            logger.debug(
+                                "🔍 Item %d, attempt %d: provider=%s success=%s content=%r error=%s",
+                                i + 1, retry_attempt + 1, response.provider, response.success,
+                                response.content, response.error
+                            )
 
                             if response.success:
-                                # Handle response based on generation mode
-                                if generation_mode == 'question_only':
-                                    # Question-only mode: use response as question, content as answer
-                                    print(f"📝 Question-only mode: Using content as answer")
-                                    question = response.content if isinstance(response.content, str) else str(response.content)
-                                    answer = content  # Use original content as answer
-                                    print(f"✅ Question-only result:")
-                                    print(f"   Question: {repr(question)}")
-                                    print(f"   Answer: {repr(answer)} (original content)")
-                                else:
-                                    # Q&A pair mode: parse JSON response
-                                    try:
-                                        import json
-                                        print(f"🔄 Attempting JSON parsing...")
-
-                                        # First try direct parsing if it's already a dict
-                                        if isinstance(response.content, dict):
-                                            qa_data = response.content
-                                            print(f"✅ Response is already a dictionary: {type(qa_data)}")
-                                        elif isinstance(response.content, str):
-                                            # Try direct JSON parsing first
-                                            try:
-                                                qa_data = json.loads(response.content)
-                                                print(f"✅ Direct JSON parsing successful: {type(qa_data)}")
-                                            except json.JSONDecodeError:
-                                                # Use improved JSON extraction for malformed responses
-                                                print(f"   Direct parsing failed, trying JSON extraction...")
-                                                json_str = extract_json_from_text(response.content)
-                                                if json_str:
-                                                    qa_data = json.loads(json_str)
-                                                    print(f"✅ Extracted JSON parsing successful: {type(qa_data)}")
-                                                else:
-                                                    raise json.JSONDecodeError("No valid JSON found", response.content, 0)
-                                        else:
-                                            raise TypeError(f"Unexpected response content type: {type(response.content)}")
-
-                                        print(f"📊 Parsed data: {repr(qa_data)}")
-
-                                        if isinstance(qa_data, dict) and 'question' in qa_data and 'answer' in qa_data:
-                                            question = qa_data['question']
-                                            answer = qa_data['answer']  # Only use parsed answer from JSON
-                                            print(f"✅ Valid Q&A pair extracted:")
-                                            print(f"   Question: {repr(question)}")
-                                            print(f"   Answer: {repr(answer)}")
-                                        else:
-                                            # If JSON parsing fails, leave answer empty
-                                            question = response.content if response.content else None
-                                            answer = ''  # Empty answer if JSON parsing fails
-                                            print(f"❌ Invalid Q&A structure - missing keys or wrong format")
-                                            print(f"   Fallback Question: {repr(question)}")
-                                            print(f"   Answer: {repr(answer)} (empty)")
-                                    except (json.JSONDecodeError, TypeError) as e:
-                                        # If JSON parsing fails, leave answer empty
-                                        question = response.content if response.content else None
-                                        answer = ''  # Empty answer if JSON parsing fails
-                                        print(f"❌ JSON parsing failed: {str(e)}")
-                                        print(f"   Fallback Question: {repr(question)}")
-                                        print(f"   Answer: {repr(answer)} (empty)")
-
-                                print(f"🎯 Final Result:")
-                                print(f"   Question: {repr(question)}")
-                                print(f"   Answer: {repr(answer)}")
-                                print("=" * 80)
+                                question, answer = parse_response(response, content)
+                                logger.debug("🎯 Item %d parsed: question=%r answer=%r", i + 1, question, answer)
 
                                 provider_used = response.provider.value if response.provider else 'unknown'
+                                if cache_key and question and answer:
+                                    await asyncio.to_thread(qa_cache.put, cache_key, question, answer, provider_used)
                                 break  # Success, exit retry loop
                             else:
-                                logger.warning(f"⚠️ Item {i + 1}, attempt {retry_attempt + 1}: {response.error}")
+                                logger.warning("⚠️ Item %d, attempt %d: %s", i + 1, retry_attempt + 1, response.error)
 
                                 # Check if this is a provider-specific error with disable_fallback
                                 if (disable_fallback and response.provider and
                                     response.metadata and response.metadata.get('disable_fallback')):
                                     # Return immediately with provider-specific error information
-                                    question_generation_progress['is_generating'] = False
-                                    question_generation_progress['current_status'] = 'failed'
-
-                                    return [], 0, {
+                                    return {
                                         'failed_provider': response.provider.value,
                                         'provider_display_name': response.metadata.get('provider_display_name'),
                                         'error_message': response.error
@@ -1389,87 +1574,100 @@ def generate_questions_with_progress():
                                 if retry_attempt < max_item_retries - 1:
                                     question_generation_progress['current_status'] = 'retrying'
                                     question_generation_progress['retry_count'] += 1
-                                    await asyncio.sleep(1)  # Brief pause before retry
+                                    await asyncio.sleep(_retry_backoff_seconds(retry_attempt))
 
                         except Exception as e:
                             error_msg = str(e).lower()
                             if '429' in error_msg or 'rate limit' in error_msg:
                                 # Rate limit detected
                                 question_generation_progress['current_status'] = 'rate_limited'
-                                wait_time = min(30, 2 ** retry_attempt)  # Cap at 30 seconds
-                                question_generation_progress['rate_limit_wait'] = wait_time
+                                wait_time = _retry_backoff_seconds(retry_attempt, e)
+                                question_generation_progress['rate_limit_wait'] = round(wait_time, 1)
 
-                                logger.warning(f"🚦 Rate limit hit for item {i + 1}, waiting {wait_time}s (attempt {retry_attempt + 1})")
+                                logger.warning("🚦 Rate limit hit for item %d, waiting %.1fs (attempt %d)", i + 1, wait_time, retry_attempt + 1)
                                 await asyncio.sleep(wait_time)
                                 question_generation_progress['rate_limit_wait'] = 0
                             else:
-                                logger.warning(f"⚠️ Item {i + 1}, attempt {retry_attempt + 1} failed: {e}")
+                                logger.warning("⚠️ Item %d, attempt %d failed: %s", i + 1, retry_attempt + 1, e)
                                 if retry_attempt < max_item_retries - 1:
                                     question_generation_progress['current_status'] = 'retrying'
                                     question_generation_progress['retry_count'] += 1
-                                    await asyncio.sleep(1)
+                                    await asyncio.sleep(_retry_backoff_seconds(retry_attempt, e))
 
-                    # Create result item
-                    result_item = item.copy()
-                    result_item['question'] = question
-                    result_item['answer'] = answer
-                    result_item['question_generated'] = question is not None
-                    result_item['provider_used'] = provider_used
+                    if batch_future:
+                        batch_future.set_result((question, answer) if question and answer else None)
 
                     if question:
                         successful_count += 1
-                        question_generation_progress['successful_count'] = successful_count
-                        question_generation_progress['current_question'] = question
-                        question_generation_progress['generated_questions'].append({
+                        generated_question = {
                             'index': i,
                             'question': question,
                             'answer': answer or '',  # Include answer in progress tracking
-                            'content': content[:100] + '...',
+                            'content': content[:100] + '...' if len(content) > 100 else content,
                             'section': item.get('section', ''),
                             'provider_used': provider_used
-                        })
-                        logger.info(f"✅ Item {i + 1}: Question-Answer pair generated successfully using {provider_used}")
+                        }
+                        question_generation_progress['successful_count'] = successful_count
+                        question_generation_progress['current_question'] = question
+                        question_generation_progress['generated_questions'].append(generated_question)
+                        publish_question_generation_progress({'generated_question': generated_question})
+                        if log_item:
+                            logger.info("✅ Item %d: Question-Answer pair generated successfully using %s", i + 1, provider_used)
                     else:
                         question_generation_progress['failed_count'] += 1
-                        logger.warning(f"❌ Item {i + 1}: Question generation failed after {max_item_retries} attempts")
+                        logger.warning("❌ Item %d: Question generation failed after %d attempts", i + 1, max_item_retries)
 
-                    processed_results.append(result_item)
+                    # Serialized once generation has finished
+                    results[i] = QGResult(item, question, answer, provider_used)
+                    return None
 
-                    # Update progress percentage after processing item
-                    question_generation_progress['progress_percent'] = int(((i + 1) / len(data_to_process)) * 100)
-                    logger.info(f"✅ Item {i + 1}/{len(data_to_process)} processed ({question_generation_progress['progress_percent']}%)")
+                # Bound in-flight provider calls so large batches don't trip rate limits
+                semaphore = asyncio.Semaphore(QUESTION_GENERATION_CONCURRENCY)
 
-                # Merge processed results back with original data
-                final_results = []
-                processed_dict = {item['id']: item for item in processed_results}
+                async def process_item_bounded(i, item):
+                    async with semaphore:
+                        return await process_item(i, item)
 
-                for original_item in data:
-                    if original_item['id'] in processed_dict:
-                        # Use the processed version with new question
-                        final_results.append(processed_dict[original_item['id']])
-                    else:
-                        # Keep the original item unchanged (already had a question)
-                        final_results.append(original_item)
+                tasks = [asyncio.create_task(process_item_bounded(i, item)) for i, item in enumerate(data_to_process)]
+                completed = 0
 
-                return final_results, successful_count, None
+                try:
+                    # Drive progress in completion order while results stay in input order
+                    for next_completed in asyncio.as_completed(tasks):
+                        provider_error = await next_completed
+                        if provider_error:
+                            question_generation_progress['is_generating'] = False
+                            question_generation_progress['current_status'] = 'failed'
+                            _publish_progress_counts(error=provider_error['error_message'])
+                            return [], 0, provider_error
+
+                        completed += 1
+                        question_generation_progress['current_item'] = completed
+                        question_generation_progress['progress_percent'] = int((completed / total_items) * 100)
+                        _publish_progress_counts()
+                        if completed % QUESTION_GENERATION_LOG_EVERY_N == 0 or completed == total_items:
+                            logger.info("✅ Item %d/%d processed (%d%%)", completed, total_items,
+                                        question_generation_progress['progress_percent'])
+                finally:
+                    # Stop outstanding work if generation was aborted early
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
 
-            # Run async generation
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                results, successful_count, provider_error = loop.run_until_complete(generate_questions_with_progress_async())
+                results = [result.to_dict() if isinstance(result, QGResult) else result for result in results]
+                return results, successful_count, None
 
-                # Check if there was a provider-specific error
-                if provider_error:
-                    return jsonify({
-                        'success': False,
-                        'error': provider_error['error_message'],
-                        'failed_provider': provider_error['failed_provider'],
-                        'provider_display_name': provider_error['provider_display_name']
-                    }), 400
+            # Run async generation on the shared background loop
+            results, successful_count, provider_error = run_in_background_loop(generate_questions_with_progress_async())
 
-            finally:
-                loop.close()
+            # Check if there was a provider-specific error
+            if provider_error:
+                return jsonify({
+                    'success': False,
+                    'error': provider_error['error_message'],
+                    'failed_provider': provider_error['failed_provider'],
+                    'provider_display_name': provider_error['provider_display_name']
+                }), 400
 
             provider_used_display = preferred_provider if preferred_provider else 'ai_service_manager'
 
@@ -1484,6 +1682,7 @@ def generate_questions_with_progress():
         question_generation_progress['progress_percent'] = 100
         question_generation_progress['current_status'] = 'completed'
         question_generation_progress['rate_limit_wait'] = 0
+        _publish_progress_counts()
 
         logger.info(f'🎯 Real-time question generation completed: {successful_count}/{len(data_to_process)} successful, {question_generation_progress["failed_count"]} failed')
 
@@ -1500,6 +1699,7 @@ def generate_questions_with_progress():
         question_generation_progress['is_generating'] = False
         question_generation_progress['current_status'] = 'failed'
         question_generation_progress['rate_limit_wait'] = 0
+        _publish_progress_counts(error=str(e))
         logger.error(f'❌ Error in real-time question generation: {str(e)}')
         return jsonify({
             'error': f'Failed to generate questions: {str(e)}',
@@ -1508,22 +1708,52 @@ def generate_questions_with_progress():
 
 @app.route('/api/question-generation-progress', methods=['GET'])
 def get_question_generation_progress():
-    """Get current question generation progress"""
-    return jsonify(question_generation_progress)
+    """Get current question generation progress (snapshot; prefer the stream endpoint)"""
+    return ojsonify(question_generation_progress)
+
+def _sse_bytes(obj):
+    """Encode a progress payload for an SSE data line"""
+    body = dumps_json(obj)
+    return body if isinstance(body, bytes) else body.encode('utf-8')
+
+@app.route('/api/question-generation-progress/stream', methods=['GET'])
+def stream_question_generation_progress():
+    """Stream question generation progress deltas as Server-Sent Events"""
+    def generate():
+        subscriber = queue.Queue(maxsize=PROGRESS_STREAM_MAX_PENDING)
+        try:
+            # Subscribe only once the body is actually streamed: a generator that never
+            # starts (HEAD request, client gone before the first chunk) never runs its finally
+            with _progress_subscribers_lock:
+                _progress_subscribers.append(subscriber)
+
+            # Start with the full snapshot so late subscribers are in sync
+            yield b"event: snapshot\ndata: " + _sse_bytes(question_generation_progress) + b"\n\n"
+            while True:
+                try:
+                    delta = subscriber.get(timeout=PROGRESS_STREAM_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield b": keepalive\n\n"
+                    continue
+                yield b"data: " + _sse_bytes(delta) + b"\n\n"
+        finally:
+            with _progress_subscribers_lock:
+                _progress_subscribers.remove(subscriber)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 @app.route('/api/question-generation-status', methods=['GET'])
 def question_generation_status():
     """Get question generation service status"""
     # Wait for initialization to complete (with timeout)
     max_wait_seconds = 10  # Wait up to 10 seconds for initialization
-    wait_interval = 0.1  # Check every 100ms
-    elapsed = 0
-
-    while not ai_initialization_complete and elapsed < max_wait_seconds:
-        time.sleep(wait_interval)
-        elapsed += wait_interval
 
-    if not ai_initialization_complete:
+    if not ai_init_event.wait(max_wait_seconds):
         logger.warning(f"AI initialization still in progress after {max_wait_seconds}s timeout")
 
     # Check if question generation is enabled
@@ -1544,7 +1774,7 @@ def question_generation_status():
             if hasattr(ai_service_manager, '_primary_provider') and ai_service_manager._primary_provider:
                 primary_provider = ai_service_manager._primary_provider.value
 
-    return jsonify({
+    return ojsonify({
         'enabled': enabled,
         'service_available': service_available,
         'configuration_valid': service_available,
@@ -1555,80 +1785,121 @@ def question_generation_status():
         'initialization_complete': ai_initialization_complete
     })
 
+# Provider tables shared by the provider listing endpoints
+ALL_PROVIDER_IDS = ('openai', 'google_gemini', 'lm_studio', 'ollama')
+PROVIDER_DISPLAY_NAMES = {
+    'openai': 'OpenAI',
+    'google_gemini': 'Google Gemini',
+    'lm_studio': 'LM Studio',
+    'ollama': 'Ollama'
+}
+REQUIRES_API_KEY = frozenset({'openai', 'google_gemini'})
+
+# Listing entries for providers the manager hasn't initialized, keyed by (provider_id, has_credentials).
+# Shared between responses and never modified.
+_UNINITIALIZED_PROVIDER_ENTRIES = {
+    (provider_id, has_credentials): {
+        'name': PROVIDER_DISPLAY_NAMES[provider_id],
+        'available': False,
+        'isDefault': False,
+        'status': 'configured' if has_credentials else 'not_configured',  # Configured means not tested yet
+        'models': [],
+        'last_error': None,
+        'has_credentials': has_credentials
+    }
+    for provider_id in ALL_PROVIDER_IDS
+    for has_credentials in (True, False)
+}
+
+
+def _build_provider_listing(request_credentials, initialized_payload):
+    """
+    Build the provider listing, merging the request's credential flags onto the cached provider state.
+
+    Args:
+        request_credentials: provider_id -> ProviderCredentials from the request headers
+        initialized_payload: provider_id -> cached status fields of initialized providers
+
+    Returns:
+        dict: provider_id -> listing entry
+    """
+    providers = {}
+    for provider_id in ALL_PROVIDER_IDS:
+        credentials = request_credentials.get(provider_id)
+        has_credentials = credentials is not None and credentials.api_key is not None
+
+        status_fields = initialized_payload.get(provider_id)
+        if status_fields is not None:
+            providers[provider_id] = {
+                'name': PROVIDER_DISPLAY_NAMES[provider_id],
+                **status_fields,
+                'has_credentials': has_credentials
+            }
+        else:
+            providers[provider_id] = _UNINITIALIZED_PROVIDER_ENTRIES[(provider_id, has_credentials)]
+    return providers
+
+
+# Short-lived cache of serialized provider listings - the frontend polls these endpoints
+# frequently while the underlying data only changes on initialization or credential updates
+PROVIDERS_CACHE_TTL_SECONDS = 3
+_providers_cache = {}
+_providers_cache_lock = threading.Lock()
+
+
+def _providers_cache_key(endpoint, request_credentials):
+    """Build a cache key from the inputs that shape a provider listing (never the secrets themselves)"""
+    credential_flags = tuple(
+        (provider_id, credentials.api_key is not None)
+        for provider_id, credentials in sorted(request_credentials.items())
+    )
+    return endpoint, ai_initialization_complete, credential_flags
+
+
+def _get_cached_providers_response(cache_key):
+    """Return the cached JSON response for a key if it has not expired"""
+    with _providers_cache_lock:
+        entry = _providers_cache.get(cache_key)
+    if entry and entry[0] > time.monotonic():
+        return Response(entry[1], mimetype='application/json')
+    return None
+
+
+def _cache_providers_response(cache_key, payload):
+    """Serialize a provider listing once, cache it and return it as a response"""
+    body = dumps_json(payload)
+    with _providers_cache_lock:
+        _providers_cache[cache_key] = (time.monotonic() + PROVIDERS_CACHE_TTL_SECONDS, body)
+    return Response(body, mimetype='application/json')
+
+
+def invalidate_providers_cache():
+    """Drop all cached provider listings (e.g. after a provider connection test)"""
+    with _providers_cache_lock:
+        _providers_cache.clear()
+
+
 @app.route('/api/ai-providers/quick-status', methods=['GET'])
 def get_ai_providers_quick_status():
     """Get quick AI provider status without waiting for initialization - optimized for polling"""
     try:
-        from request_credentials import extract_all_credentials_from_headers
-
-        providers = {}
-
-        # Provider display names
-        provider_names = {
-            'openai': 'OpenAI',
-            'google_gemini': 'Google Gemini',
-            'lm_studio': 'LM Studio',
-            'ollama': 'Ollama'
-        }
 
         # Get credentials from request headers (client-side storage)
         request_credentials = extract_all_credentials_from_headers(request)
-        all_provider_ids = ['openai', 'google_gemini', 'lm_studio', 'ollama']
 
-        # Check AI service manager for initialized providers (no waiting)
-        initialized_providers = {}
-        primary_provider = None
+        cache_key = _providers_cache_key('quick-status', request_credentials)
+        cached_response = _get_cached_providers_response(cache_key)
+        if cached_response:
+            return cached_response
+
+        # Per-provider status fields are cached by the manager until provider state changes
+        initialized_payload = {}
         if ai_service_manager and ai_initialization_complete:
-            provider_status = ai_service_manager.get_provider_status()
-            primary_provider = getattr(ai_service_manager, '_primary_provider', None)
-
-            for provider_id, status in provider_status.items():
-                initialized_providers[provider_id] = status
-
-        # Build provider list
-        for provider_id in all_provider_ids:
-            credentials = request_credentials.get(provider_id)
-            has_credentials = credentials is not None and credentials.api_key is not None
-
-            # Check if provider requires API key
-            requires_api_key = provider_id in ['openai', 'google_gemini']
-
-            if provider_id in initialized_providers:
-                # Provider is initialized - use its status
-                status = initialized_providers[provider_id]
-                providers[provider_id] = {
-                    'name': provider_names.get(provider_id, provider_id.replace('_', ' ').title()),
-                    'available': status['status'] == 'available',
-                    'isDefault': primary_provider and primary_provider.value == provider_id,
-                    'status': status['status'],
-                    'models': [model['name'] for model in status['available_models']] if status['available_models'] else [],
-                    'last_error': status['last_error'],
-                    'has_credentials': has_credentials
-                }
-            elif has_credentials:
-                # Provider has credentials but not initialized yet
-                providers[provider_id] = {
-                    'name': provider_names.get(provider_id, provider_id.replace('_', ' ').title()),
-                    'available': False,
-                    'isDefault': False,
-                    'status': 'configured',
-                    'models': [],
-                    'last_error': None,
-                    'has_credentials': True
-                }
-            else:
-                # Provider has no credentials
-                providers[provider_id] = {
-                    'name': provider_names.get(provider_id, provider_id.replace('_', ' ').title()),
-                    'available': False,
-                    'isDefault': False,
-                    'status': 'not_configured',
-                    'models': [],
-                    'last_error': None,
-                    'has_credentials': False
-                }
+            initialized_payload = ai_service_manager.get_cached_provider_payload()
 
-        return jsonify({
+        providers = _build_provider_listing(request_credentials, initialized_payload)
+
+        return _cache_providers_response(cache_key, {
             'success': True,
             'data': providers,
             'initialization_complete': ai_initialization_complete
@@ -1646,95 +1917,29 @@ def get_ai_providers_quick_status():
 def get_ai_providers():
     """Get available AI providers with status based on credentials and initialization"""
     try:
-        from request_credentials import extract_all_credentials_from_headers
 
         # Wait for initialization to complete (with timeout)
         max_wait_seconds = 10  # Wait up to 10 seconds for initialization
-        wait_interval = 0.1  # Check every 100ms
-        elapsed = 0
 
-        while not ai_initialization_complete and elapsed < max_wait_seconds:
-            time.sleep(wait_interval)
-            elapsed += wait_interval
-
-        if not ai_initialization_complete:
+        if not ai_init_event.wait(max_wait_seconds):
             logger.warning(f"AI initialization still in progress after {max_wait_seconds}s timeout")
 
-        providers = {}
-
-        # Provider display names
-        provider_names = {
-            'openai': 'OpenAI',
-            'google_gemini': 'Google Gemini',
-            'lm_studio': 'LM Studio',
-            'ollama': 'Ollama'
-        }
-
         # Get credentials from request headers (client-side storage)
         request_credentials = extract_all_credentials_from_headers(request)
-        all_provider_ids = ['openai', 'google_gemini', 'lm_studio', 'ollama']
-
-        # Check AI service manager for initialized providers
-        initialized_providers = {}
-        primary_provider = None
-        if ai_service_manager:
-            provider_status = ai_service_manager.get_provider_status()
-            primary_provider = getattr(ai_service_manager, '_primary_provider', None)
 
-            for provider_id, status in provider_status.items():
-                initialized_providers[provider_id] = status
+        cache_key = _providers_cache_key('providers', request_credentials)
+        cached_response = _get_cached_providers_response(cache_key)
+        if cached_response:
+            return cached_response
 
-        # Build provider list including both initialized and credential-only providers
-        for provider_id in all_provider_ids:
-            credentials = request_credentials.get(provider_id)
-            has_credentials = credentials is not None and credentials.api_key is not None
-
-            # Check if provider requires API key
-            requires_api_key = provider_id in ['openai', 'google_gemini']
-            has_valid_credentials = False
+        # Per-provider status fields are cached by the manager until provider state changes
+        initialized_payload = {}
+        if ai_service_manager:
+            initialized_payload = ai_service_manager.get_cached_provider_payload()
 
-            if requires_api_key:
-                has_valid_credentials = has_credentials
-            else:
-                # Local providers (LM Studio, Ollama) don't require API key
-                has_valid_credentials = True
-
-            if provider_id in initialized_providers:
-                # Provider is initialized - use its status
-                status = initialized_providers[provider_id]
-                providers[provider_id] = {
-                    'name': provider_names.get(provider_id, provider_id.replace('_', ' ').title()),
-                    'available': status['status'] == 'available',
-                    'isDefault': primary_provider and primary_provider.value == provider_id,
-                    'status': status['status'],
-                    'models': [model['name'] for model in status['available_models']] if status['available_models'] else [],
-                    'last_error': status['last_error'],
-                    'has_credentials': has_credentials
-                }
-            elif has_credentials:
-                # Provider has credentials but not initialized yet
-                providers[provider_id] = {
-                    'name': provider_names.get(provider_id, provider_id.replace('_', ' ').title()),
-                    'available': False,
-                    'isDefault': False,
-                    'status': 'configured',  # Has credentials but not tested
-                    'models': [],
-                    'last_error': None,
-                    'has_credentials': True
-                }
-            else:
-                # Provider has no credentials
-                providers[provider_id] = {
-                    'name': provider_names.get(provider_id, provider_id.replace('_', ' ').title()),
-                    'available': False,
-                    'isDefault': False,
-                    'status': 'not_configured',
-                    'models': [],
-                    'last_error': None,
-                    'has_credentials': False
-                }
+        providers = _build_provider_listing(request_credentials, initialized_payload)
 
-        return jsonify({
+        return _cache_providers_response(cache_key, {
             'success': True,
             'data': providers,
             'initialization_complete': ai_initialization_complete
@@ -1747,6 +1952,30 @@ def get_ai_providers():
             'error': str(e)
         }), 500
 
+# In-flight provider connection tests, keyed by provider and credentials, so repeated clicks
+# on "test" share one outbound call
+_inflight_tests = {}
+_inflight_tests_lock = threading.Lock()
+
+
+def _credentials_fingerprint(credentials):
+    """Hash a provider's request credentials into a cache key (never keeps the secrets themselves)"""
+    return hashlib.sha256(
+        json.dumps(asdict(credentials), sort_keys=True, default=str).encode('utf-8')
+    ).hexdigest()
+
+
+def _provider_test_key(provider_id, credentials):
+    """Build the single-flight key for a connection test"""
+    return f"{provider_id}:{_credentials_fingerprint(credentials)}"
+
+
+def _discard_inflight_test(test_key, future):
+    """Forget a finished connection test unless a newer one already took its place"""
+    with _inflight_tests_lock:
+        if _inflight_tests.get(test_key) is future:
+            del _inflight_tests[test_key]
+
 @app.route('/api/ai-providers/<provider_id>/test', methods=['POST'])
 def test_ai_provider(provider_id):
     """
@@ -1759,16 +1988,11 @@ def test_ai_provider(provider_id):
     4. Returns detailed status information
     """
     try:
-        from request_credentials import get_provider_credential
-        from ai_service_base import AIProviderType
-        from ai_config_loader import create_config_from_request_credentials
-
         # Get credentials from request headers (client-side storage)
         credentials = get_provider_credential(request, provider_id)
 
         # Local providers (Ollama, LM Studio) don't require API keys
-        local_providers = ['ollama', 'lm_studio']
-        is_local = provider_id in local_providers
+        is_local = provider_id in ALL_PROVIDER_IDS and provider_id not in REQUIRES_API_KEY
 
         if not credentials:
             error_msg = f'No endpoint configured for {provider_id}' if is_local else f'No credentials provided for {provider_id}. Please configure your API key.'
@@ -1780,11 +2004,7 @@ def test_ai_provider(provider_id):
             })
 
         # Convert provider_id to AIProviderType
-        provider_type = None
-        for pt in AIProviderType:
-            if pt.value == provider_id:
-                provider_type = pt
-                break
+        provider_type = _PROVIDER_TYPE_BY_ID.get(provider_id)
 
         if not provider_type:
             return jsonify({
@@ -1797,6 +2017,7 @@ def test_ai_provider(provider_id):
         # Create a temporary service instance for testing
         async def test_provider_standalone():
             """Test provider connection without requiring full initialization"""
+            service = None
             try:
                 # Create config from request credentials
                 config = create_config_from_request_credentials(provider_id, credentials)
@@ -1850,16 +2071,35 @@ def test_ai_provider(provider_id):
                     'success': False,
                     'error': str(e)
                 }
+            finally:
+                # The temporary service lives on the long-lived background loop, so release
+                # its client sessions here rather than leaking one per test
+                if service is not None:
+                    try:
+                        await service.cleanup()
+                    except Exception as e:
+                        logger.warning(f"Error cleaning up {provider_id} test service: {e}")
+
+        # Run async test with timeout on the shared background loop, joining an identical test
+        # that is already in flight instead of hitting the provider again
+        timeout = 60 if is_local else 30  # Longer timeout for local providers
+        test_key = _provider_test_key(provider_id, credentials)
+        with _inflight_tests_lock:
+            future = _inflight_tests.get(test_key)
+            if future is None:
+                # The timeout is enforced by the owning task rather than by each waiter: the
+                # future is shared, so a single waiter must never cancel it for the others
+                future = asyncio.run_coroutine_threadsafe(
+                    asyncio.wait_for(test_provider_standalone(), timeout), background_loop
+                )
+                _inflight_tests[test_key] = future
+                future.add_done_callback(lambda done: _discard_inflight_test(test_key, done))
+            else:
+                logger.info(f"Joining in-flight connection test for {provider_id}")
 
-        # Run async test with timeout
         try:
-            import concurrent.futures
-            timeout = 60 if is_local else 30  # Longer timeout for local providers
-
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, test_provider_standalone())
-                result = future.result(timeout=timeout)
-        except concurrent.futures.TimeoutError:
+            result = future.result(timeout)
+        except (concurrent.futures.TimeoutError, asyncio.TimeoutError, concurrent.futures.CancelledError):
             logger.error(f"Timeout testing {provider_id}")
             result = {
                 'success': False,
@@ -1872,6 +2112,9 @@ def test_ai_provider(provider_id):
                 'error': str(e)
             }
 
+        # Provider availability may have changed - don't serve stale listings
+        invalidate_providers_cache()
+
         # Return detailed response
         response = {
             'success': result['success'],
@@ -1895,6 +2138,230 @@ def test_ai_provider(provider_id):
             'error': str(e)
         }), 500
 
+# Model-discovery sessions reused across requests, keyed by (provider_id, base_url), so
+# polling a local provider for its models doesn't pay a fresh connection setup each time.
+# Only touched from the background loop.
+MAX_DISCOVERY_SESSIONS = 8
+_discovery_sessions = {}
+# One connector behind every discovery session, so sockets and DNS lookups are reused across endpoints
+_discovery_connector = None
+
+
+async def _get_discovery_session(provider_id, base_url, timeout):
+    """Get the pooled aiohttp session for a provider endpoint, creating it if needed"""
+    key = (provider_id, base_url)
+    session = _discovery_sessions.get(key)
+    if session and not session.closed:
+        return session
+
+    # Evict the oldest session once the pool is full
+    if key not in _discovery_sessions and len(_discovery_sessions) >= MAX_DISCOVERY_SESSIONS:
+        oldest_key = next(iter(_discovery_sessions))
+        await _discovery_sessions.pop(oldest_key).close()
+
+    session = aiohttp.ClientSession(
+        connector=_get_discovery_connector(),
+        connector_owner=False,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+        headers={"Content-Type": "application/json"}
+    )
+    _discovery_sessions[key] = session
+    return session
+
+
+def _get_discovery_connector():
+    """Get the connector shared by all discovery sessions, creating it if needed"""
+    global _discovery_connector
+    if _discovery_connector is None or _discovery_connector.closed:
+        _discovery_connector = aiohttp.TCPConnector(
+            limit=64,
+            limit_per_host=16,
+            ttl_dns_cache=300,
+            keepalive_timeout=60,
+            enable_cleanup_closed=True
+        )
+    return _discovery_connector
+
+
+async def _close_discovery_sessions():
+    """Close all pooled model-discovery sessions and their shared connector"""
+    global _discovery_connector
+    while _discovery_sessions:
+        _, session = _discovery_sessions.popitem()
+        await session.close()
+    if _discovery_connector is not None:
+        await _discovery_connector.close()
+        _discovery_connector = None
+
+
+# Models discovered from local providers, keyed by (provider_id, credentials fingerprint) -> (fetched_at, models)
+MODELS_CACHE_TTL_SECONDS = 30
+# Per-provider discovery limit, so one unreachable provider can't hold up a batch
+MODEL_DISCOVERY_TIMEOUT_SECONDS = 10
+# Providers that support dynamic model discovery; every other provider takes a manually entered model name
+LOCAL_DISCOVERY_PROVIDER_IDS = frozenset({'lm_studio', 'ollama'})
+_models_cache = {}
+_models_cache_lock = threading.Lock()
+# Keys with a background refresh in flight, so concurrent stale hits schedule only one
+_models_refreshing = set()
+
+
+def _local_discovery_credentials(request_credentials):
+    """Pick the local providers with configured credentials out of a request's credentials"""
+    return {
+        provider_id: credentials
+        for provider_id, credentials in request_credentials.items()
+        if provider_id in LOCAL_DISCOVERY_PROVIDER_IDS and credentials
+    }
+
+
+def _get_cached_models(provider_id, credentials):
+    """
+    Look up previously discovered models for a local provider.
+
+    Returns:
+        tuple: (models or None, whether the entry is still within its TTL)
+    """
+    with _models_cache_lock:
+        entry = _models_cache.get((provider_id, _credentials_fingerprint(credentials)))
+    if not entry:
+        return None, False
+    return entry[1], time.monotonic() - entry[0] < MODELS_CACHE_TTL_SECONDS
+
+
+async def _discover_local_models(provider_id, credentials):
+    """
+    Discover the models served by a local provider without fully initializing it.
+
+    Returns:
+        list: Model dictionaries, or None if discovery failed
+    """
+    try:
+        provider_type = _PROVIDER_TYPE_BY_ID.get(provider_id)
+        config = create_config_from_request_credentials(provider_id, credentials) if provider_type else None
+        if not config:
+            return None
+
+        # Create temporary service instance; only model discovery is needed, not the chat endpoint
+        service = ai_service_manager._create_service(provider_type, config)
+
+        # Borrow the pooled session for model discovery only
+        service._session = await _get_discovery_session(
+            provider_id, service._base_url, service.config.timeout
+        )
+
+        try:
+            # Discover models without full initialization
+            await service._discover_models()
+            available_models = await service.get_available_models()
+        finally:
+            # Detach the pooled session so it outlives this temporary service
+            service._session = None
+
+        logger.info(f"📋 Discovered {len(available_models)} models from {provider_id}")
+        return [model.to_dict() for model in available_models]
+    except Exception as e:
+        logger.error(f"Error discovering models for {provider_id}: {e}")
+        return None
+
+
+async def _prefetch_local_models(credentials_by_provider):
+    """
+    Discover models for several local providers in parallel and cache the results.
+
+    Args:
+        credentials_by_provider: provider_id -> ProviderCredentials
+
+    Returns:
+        dict: provider_id -> list of model dictionaries (None where discovery failed)
+    """
+    provider_ids = list(credentials_by_provider)
+    results = await asyncio.gather(*(
+        asyncio.wait_for(
+            _discover_local_models(provider_id, credentials_by_provider[provider_id]),
+            MODEL_DISCOVERY_TIMEOUT_SECONDS
+        )
+        for provider_id in provider_ids
+    ), return_exceptions=True)
+    results = [None if isinstance(models, BaseException) else models for models in results]
+
+    fetched_at = time.monotonic()
+    with _models_cache_lock:
+        for provider_id, models in zip(provider_ids, results):
+            key = (provider_id, _credentials_fingerprint(credentials_by_provider[provider_id]))
+            _models_refreshing.discard(key)
+            if models is not None:
+                _models_cache[key] = (fetched_at, models)
+
+    return dict(zip(provider_ids, results))
+
+
+def _schedule_models_refresh(request_credentials):
+    """Refresh cached local-provider models in the background without waiting for the result"""
+    credentials_by_provider = {}
+    with _models_cache_lock:
+        for provider_id, credentials in _local_discovery_credentials(request_credentials).items():
+            key = (provider_id, _credentials_fingerprint(credentials))
+            if key not in _models_refreshing:
+                _models_refreshing.add(key)
+                credentials_by_provider[provider_id] = credentials
+
+    if credentials_by_provider:
+        asyncio.run_coroutine_threadsafe(_prefetch_local_models(credentials_by_provider), background_loop)
+
+
+def invalidate_models_cache(provider_id):
+    """Drop all cached model lists for a provider"""
+    with _models_cache_lock:
+        for key in [key for key in _models_cache if key[0] == provider_id]:
+            del _models_cache[key]
+
+
+# Models reported for local providers before the service manager exists
+FALLBACK_MODELS = {
+    'lm_studio': [
+        {
+            'name': 'local-model',
+            'display_name': 'Local Model',
+            'description': 'Local model running in LM Studio',
+            'max_tokens': 4096
+        }
+    ],
+    'ollama': [
+        {
+            'name': 'llama2',
+            'display_name': 'Llama 2',
+            'description': 'Default Llama 2 model',
+            'max_tokens': 4096
+        }
+    ]
+}
+
+# The fallback responses never change, so they are serialized once. Only the body is shared:
+# each request gets its own Response object since after-request hooks (CORS) modify it.
+_FALLBACK_MODELS_RESPONSE_BODIES = {
+    provider_id: dumps_json({
+        'success': True,
+        'data': models,
+        'provider': provider_id,
+        'use_manual_input': False,
+        'message': 'Fallback models - actual models will be discovered when service is running'
+    })
+    for provider_id, models in FALLBACK_MODELS.items()
+}
+
+
+@app.route('/api/ai-providers/<provider_id>/models/refresh', methods=['POST'])
+def refresh_provider_models(provider_id):
+    """Forget cached models for a provider so the next models request rediscovers them"""
+    invalidate_models_cache(provider_id)
+    logger.info(f"🔄 Cleared cached models for {provider_id}")
+    return jsonify({
+        'success': True,
+        'provider': provider_id
+    })
+
+
 @app.route('/api/ai-providers/<provider_id>/models', methods=['GET'])
 def get_provider_models(provider_id):
     """Get available models for a specific AI provider
@@ -1903,37 +2370,26 @@ def get_provider_models(provider_id):
     For OpenAI, Anthropic, and other cloud providers: Returns empty list (use text input)
     """
     try:
-        from request_credentials import get_provider_credential
-        from ai_service_base import AIProviderType
-        from ai_config_loader import create_config_from_request_credentials
-
         # Debug: Log all headers
         logger.info(f"🔍 Getting models for provider: {provider_id}")
         logger.info(f"📋 Request headers: {dict(request.headers)}")
 
         # Wait for initialization to complete (with timeout)
         max_wait_seconds = 10
-        wait_interval = 0.1
-        elapsed = 0
-
-        while not ai_initialization_complete and elapsed < max_wait_seconds:
-            time.sleep(wait_interval)
-            elapsed += wait_interval
-
-        # Providers that support dynamic model discovery
-        dynamic_discovery_providers = ['ollama', 'lm_studio']
+        ai_init_event.wait(max_wait_seconds)
 
         if ai_service_manager:
             # Get provider status which includes available models
-            provider_status = ai_service_manager.get_provider_status()
+            # Model lists are rebuilt only when provider state changes
+            models_by_provider = ai_service_manager.get_cached_models_payload()
 
-            if provider_id in provider_status:
-                models = provider_status[provider_id].get('available_models', [])
+            if provider_id in models_by_provider:
+                models = models_by_provider[provider_id]
 
                 # For providers without dynamic discovery, return empty list
                 # Frontend will show text input instead of dropdown
-                if provider_id not in dynamic_discovery_providers:
-                    return jsonify({
+                if provider_id not in LOCAL_DISCOVERY_PROVIDER_IDS:
+                    return ojsonify({
                         'success': True,
                         'data': [],
                         'provider': provider_id,
@@ -1941,7 +2397,7 @@ def get_provider_models(provider_id):
                         'message': 'This provider requires manual model name input'
                     })
 
-                return jsonify({
+                return ojsonify({
                     'success': True,
                     'data': models,
                     'provider': provider_id,
@@ -1950,116 +2406,42 @@ def get_provider_models(provider_id):
             else:
                 # Provider not initialized yet - try to get credentials from headers
                 # and create a temporary service to discover models
-                if provider_id in dynamic_discovery_providers:
+                if provider_id in LOCAL_DISCOVERY_PROVIDER_IDS:
                     credentials = get_provider_credential(request, provider_id)
                     logger.info(f"🔑 Credentials extracted for {provider_id}: {credentials}")
 
                     if credentials:
-                        # Try to discover models with provided credentials
-                        async def discover_models_standalone():
-                            try:
-                                # Convert provider_id to AIProviderType
-                                provider_type = None
-                                for pt in AIProviderType:
-                                    if pt.value == provider_id:
-                                        provider_type = pt
-                                        break
-
-                                if not provider_type:
-                                    return {'success': False, 'models': []}
-
-                                # Create config from request credentials
-                                config = create_config_from_request_credentials(provider_id, credentials)
-                                if not config:
-                                    return {'success': False, 'models': []}
-
-                                # Create temporary service instance
-                                service = ai_service_manager._create_service(provider_type, config)
-
-                                # For LM Studio and Ollama, we only need to discover models
-                                # We don't need to test the chat endpoint for model discovery
-                                if provider_id in ['lm_studio', 'ollama']:
-                                    # Create session for model discovery only
-                                    connector = aiohttp.TCPConnector(
-                                        limit=10,
-                                        limit_per_host=5,
-                                        enable_cleanup_closed=True
-                                    )
-                                    service._session = aiohttp.ClientSession(
-                                        connector=connector,
-                                        timeout=aiohttp.ClientTimeout(total=service.config.timeout),
-                                        headers={"Content-Type": "application/json"}
-                                    )
-
-                                    # Discover models without full initialization
-                                    await service._discover_models()
-
-                                    # Get available models
-                                    available_models = await service.get_available_models()
-                                    logger.info(f"📋 Discovered {len(available_models)} models from {provider_id}")
-
-                                    # Cleanup session
-                                    await service.cleanup()
-
-                                    models = [
-                                        {
-                                            'name': model.name,
-                                            'display_name': model.display_name,
-                                            'description': model.description,
-                                            'max_tokens': model.max_tokens
-                                        }
-                                        for model in available_models
-                                    ]
-
-                                    return {'success': True, 'models': models}
-                                else:
-                                    # For cloud providers, use full initialization
-                                    init_success = await service.initialize()
-                                    if not init_success:
-                                        logger.error(f"Failed to initialize {provider_id} service")
-                                        return {'success': False, 'models': []}
-
-                                    # Get available models using the async method
-                                    available_models = await service.get_available_models()
-                                    logger.info(f"📋 Got {len(available_models)} models from {provider_id} service")
-
-                                    models = [
-                                        {
-                                            'name': model.name,
-                                            'display_name': model.display_name,
-                                            'description': model.description,
-                                            'max_tokens': model.max_tokens
-                                        }
-                                        for model in available_models
-                                    ]
-
-                                    # Cleanup
-                                    await service.cleanup()
-
-                                    return {'success': True, 'models': models}
-                            except Exception as e:
-                                logger.error(f"Error discovering models for {provider_id}: {e}")
-                                return {'success': False, 'models': []}
-
-                        # Run async discovery
+                        # Serve cached models; a stale entry is returned immediately and refreshed in the background
+                        cached_models, is_fresh = _get_cached_models(provider_id, credentials)
+                        if cached_models is not None:
+                            if not is_fresh:
+                                _schedule_models_refresh(extract_all_credentials_from_headers(request))
+                            return ojsonify({
+                                'success': True,
+                                'data': cached_models,
+                                'provider': provider_id,
+                                'use_manual_input': False
+                            })
+
+                        # Cache miss: discover every configured local provider in parallel on the background
+                        # loop that owns the pooled sessions, so the sibling provider's request hits the cache
                         try:
-                            import concurrent.futures
-                            with concurrent.futures.ThreadPoolExecutor() as executor:
-                                future = executor.submit(asyncio.run, discover_models_standalone())
-                                result = future.result(timeout=30)
-
-                                if result['success']:
-                                    return jsonify({
-                                        'success': True,
-                                        'data': result['models'],
-                                        'provider': provider_id,
-                                        'use_manual_input': False
-                                    })
+                            local_credentials = _local_discovery_credentials(extract_all_credentials_from_headers(request))
+                            local_credentials[provider_id] = credentials
+                            discovered = run_in_background_loop(_prefetch_local_models(local_credentials), timeout=30)
+
+                            if discovered.get(provider_id) is not None:
+                                return ojsonify({
+                                    'success': True,
+                                    'data': discovered[provider_id],
+                                    'provider': provider_id,
+                                    'use_manual_input': False
+                                })
                         except Exception as e:
                             logger.error(f"Error running async model discovery for {provider_id}: {e}")
 
                     # No credentials or discovery failed - return empty list
-                    return jsonify({
+                    return ojsonify({
                         'success': True,
                         'data': [],
                         'provider': provider_id,
@@ -2067,15 +2449,15 @@ def get_provider_models(provider_id):
                         'message': f'{provider_id} not configured yet. Please configure the endpoint first.'
                     })
                 else:
-                    return jsonify({
+                    return ojsonify({
                         'success': False,
                         'error': f'Provider {provider_id} not found'
-                    }), 404
+                    }, 404)
 
         # For providers that don't support dynamic discovery, return empty list
         # This includes: openai, anthropic, google_gemini, xai_grok, deepseek, azure_openai
-        if provider_id not in dynamic_discovery_providers:
-            return jsonify({
+        if provider_id not in LOCAL_DISCOVERY_PROVIDER_IDS:
+            return ojsonify({
                 'success': True,
                 'data': [],
                 'provider': provider_id,
@@ -2085,97 +2467,90 @@ def get_provider_models(provider_id):
 
         # For Ollama and LM Studio without service manager, return fallback models
         # These will be replaced by actual discovered models when service is initialized
-        fallback_models = {
-            'lm_studio': [
-                {
-                    'name': 'local-model',
-                    'display_name': 'Local Model',
-                    'description': 'Local model running in LM Studio',
-                    'max_tokens': 4096
-                }
-            ],
-            'ollama': [
-                {
-                    'name': 'llama2',
-                    'display_name': 'Llama 2',
-                    'description': 'Default Llama 2 model',
-                    'max_tokens': 4096
-                }
-            ]
-        }
+        if provider_id in _FALLBACK_MODELS_RESPONSE_BODIES:
+            return Response(_FALLBACK_MODELS_RESPONSE_BODIES[provider_id], mimetype='application/json')
 
-        if provider_id in fallback_models:
-            return jsonify({
-                'success': True,
-                'data': fallback_models[provider_id],
-                'provider': provider_id,
-                'use_manual_input': False,
-                'message': 'Fallback models - actual models will be discovered when service is running'
-            })
-
-        return jsonify({
+        return ojsonify({
             'success': False,
             'error': f'Provider {provider_id} not available'
-        }), 404
+        }, 404)
 
     except Exception as e:
         logger.error(f'Error getting models for provider {provider_id}: {str(e)}')
-        return jsonify({
+        return ojsonify({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
-@app.route('/api/credentials', methods=['GET'])
-def get_all_credentials():
-    """
-    DEPRECATED: Backend credential storage is disabled.
-    All credentials are stored client-side in browser localStorage.
-    """
-    return jsonify({
-        'success': False,
-        'error': 'Backend credential storage is disabled. Credentials are stored client-side only (browser localStorage).',
-        'message': '🔒 For security and user isolation, all API keys are stored in your browser only.'
-    }), 410  # 410 Gone - endpoint is permanently disabled
+@app.route('/api/ai-providers/models', methods=['GET'])
+def get_all_provider_models():
+    """Get available models for every provider in one request, discovering local providers concurrently"""
+    try:
+        # Wait for initialization to complete (with timeout)
+        max_wait_seconds = 10
+        ai_init_event.wait(max_wait_seconds)
 
+        initialized_models = ai_service_manager.get_cached_models_payload() if ai_service_manager else {}
+        request_credentials = extract_all_credentials_from_headers(request)
 
-@app.route('/api/credentials/<provider_id>', methods=['GET'])
-def get_provider_credentials(provider_id):
-    """
-    DEPRECATED: Backend credential storage is disabled.
-    All credentials are stored client-side in browser localStorage.
-    """
-    return jsonify({
-        'success': False,
-        'error': 'Backend credential storage is disabled. Credentials are stored client-side only (browser localStorage).',
-        'message': '🔒 For security and user isolation, all API keys are stored in your browser only.'
-    }), 410  # 410 Gone - endpoint is permanently disabled
+        models_by_provider = {}
+        to_discover = {}
+        stale_credentials = {}
+        for provider_id in ALL_PROVIDER_IDS:
+            if provider_id not in LOCAL_DISCOVERY_PROVIDER_IDS:
+                # Cloud providers take a manually entered model name
+                models_by_provider[provider_id] = {'data': [], 'use_manual_input': True}
+            elif provider_id in initialized_models:
+                models_by_provider[provider_id] = {
+                    'data': initialized_models[provider_id],
+                    'use_manual_input': False
+                }
+            elif request_credentials.get(provider_id):
+                credentials = request_credentials[provider_id]
+                cached_models, is_fresh = _get_cached_models(provider_id, credentials)
+                if cached_models is None:
+                    to_discover[provider_id] = credentials
+                    continue
+                if not is_fresh:
+                    stale_credentials[provider_id] = credentials
+                models_by_provider[provider_id] = {'data': cached_models, 'use_manual_input': False}
+            else:
+                models_by_provider[provider_id] = {
+                    'data': [],
+                    'use_manual_input': False,
+                    'message': f'{provider_id} not configured yet. Please configure the endpoint first.'
+                }
 
+        if stale_credentials:
+            _schedule_models_refresh(stale_credentials)
 
-@app.route('/api/credentials/<provider_id>', methods=['POST', 'PUT'])
-def save_provider_credentials(provider_id):
-    """
-    DEPRECATED: Backend credential storage is disabled.
-    All credentials are stored client-side in browser localStorage.
-    """
-    return jsonify({
-        'success': False,
-        'error': 'Backend credential storage is disabled. Credentials are stored client-side only (browser localStorage).',
-        'message': '🔒 For security and user isolation, all API keys are stored in your browser only. Use the frontend API Key Configuration dialog.'
-    }), 410  # 410 Gone - endpoint is permanently disabled
+        # One round trip to the background loop for all uncached providers; wall time is the slowest one
+        discovered = {}
+        if to_discover and ai_service_manager:
+            try:
+                discovered = run_in_background_loop(
+                    _prefetch_local_models(to_discover), timeout=MODEL_DISCOVERY_TIMEOUT_SECONDS + 5
+                )
+            except Exception as e:
+                logger.error(f"Error running batch model discovery: {e}")
 
+        for provider_id in to_discover:
+            models = discovered.get(provider_id)
+            models_by_provider[provider_id] = {'data': models or [], 'use_manual_input': False}
+            if models is None:
+                models_by_provider[provider_id]['message'] = f'Could not discover models from {provider_id}'
 
-@app.route('/api/credentials/<provider_id>', methods=['DELETE'])
-def delete_provider_credentials(provider_id):
-    """
-    DEPRECATED: Backend credential storage is disabled.
-    All credentials are stored client-side in browser localStorage.
-    """
-    return jsonify({
-        'success': False,
-        'error': 'Backend credential storage is disabled. Credentials are stored client-side only (browser localStorage).',
-        'message': '🔒 For security and user isolation, all API keys are stored in your browser only. Use the frontend API Key Configuration dialog.'
-    }), 410  # 410 Gone - endpoint is permanently disabled
+        return ojsonify({
+            'success': True,
+            'data': models_by_provider
+        })
 
+    except Exception as e:
+        logger.error(f'Error getting models for all providers: {str(e)}')
+        return ojsonify({
+            'success': False,
+            'error': str(e)
+        }, 500)
 
 @app.route('/api/test', methods=['GET'])
 def test_endpoint():
@@ -2204,21 +2579,33 @@ def test_endpoint():
 
 
 
+# Set once cleanup has run; it is registered with atexit and also called when app.run() returns
+_cleanup_done = False
+
+
 def cleanup_ai_services():
     """Clean up AI services on shutdown."""
-    global ai_service_manager
+    global ai_service_manager, _cleanup_done
+    # The background loop is stopped below, so a second run would only wait out its timeouts
+    if _cleanup_done:
+        return
+    _cleanup_done = True
+
     if ai_service_manager:
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(ai_service_manager.cleanup())
-            loop.close()
+            run_in_background_loop(ai_service_manager.cleanup(), timeout=10)
             logger.info("AI services cleaned up successfully")
         except Exception as e:
             logger.error(f"Error cleaning up AI services: {e}")
 
+    try:
+        run_in_background_loop(_close_discovery_sessions(), timeout=5)
+    except Exception as e:
+        logger.warning(f"Error closing model discovery sessions: {e}")
+
+    background_loop.call_soon_threadsafe(background_loop.stop)
+
 # Register cleanup handler
-import atexit
 atexit.register(cleanup_ai_services)
 
 if __name__ == '__main__':
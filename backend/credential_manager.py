@@ -8,15 +8,39 @@ Credentials can be stored in environment variables or a secure configuration fil
 
 import os
 import json
+import hashlib
 import logging
-from typing import Dict, Optional, Any
+import threading
+from typing import Dict, Optional, Any, Set, Tuple
 from pathlib import Path
-from cryptography.fernet import Fernet
 import base64
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, replace
+
+# orjson is optional: faster parsing and serialization of the credentials file
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Credential fields stored encrypted on disk
+SENSITIVE_FIELDS = ('api_key', 'secret_access_key', 'service_account_json')
+
+# Longest run of '*' a masked value is shown with; the UI only needs a hint that a secret is set
+MAX_MASK_WIDTH = 12
+
+# Every Fernet token (version byte 0x80) starts with this in its urlsafe base64 form. Values
+# written by older versions were base64-encoded once more on top and don't.
+FERNET_TOKEN_PREFIX = 'gAAAAA'
+
+# Process-wide caches shared by all CredentialManager instances:
+# key file path -> encryption key, and credentials file path -> (mtime_ns, parsed file contents)
+_KEY_CACHE: Dict[Path, bytes] = {}
+_CREDENTIALS_FILE_CACHE: Dict[Path, Tuple[int, Dict[str, Dict[str, Any]]]] = {}
+
 
 @dataclass
 class ProviderCredentials:
@@ -34,6 +58,23 @@ class ProviderCredentials:
     service_account_json: Optional[str] = None
     custom_params: Optional[Dict[str, Any]] = None
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a plain dictionary (a cheaper asdict for this flat dataclass)."""
+        return {
+            'provider_id': self.provider_id,
+            'api_key': self.api_key,
+            'endpoint': self.endpoint,
+            'deployment_name': self.deployment_name,
+            'api_version': self.api_version,
+            'model_name': self.model_name,
+            'region': self.region,
+            'project_id': self.project_id,
+            'access_key_id': self.access_key_id,
+            'secret_access_key': self.secret_access_key,
+            'service_account_json': self.service_account_json,
+            'custom_params': dict(self.custom_params) if self.custom_params else self.custom_params
+        }
+
 
 class CredentialManager:
     """Manages secure storage and retrieval of AI provider credentials."""
@@ -49,30 +90,70 @@ class CredentialManager:
         self.config_file = self.config_dir / 'ai_credentials.json'
         self.key_file = self.config_dir / '.credential_key'
         
-        # Initialize encryption key
-        self._encryption_key = self._get_or_create_encryption_key()
-        self._cipher = Fernet(self._encryption_key)
-        
-        # Load existing credentials
+        # Encryption is set up on first secret access (see _cipher) - importing cryptography
+        # and reading the key file is skipped entirely by processes that never touch a secret
+        self._fernet = None
+
+        # Ciphertext of sensitive fields per provider, keyed by field: (plaintext hash, ciphertext),
+        # so unchanged secrets are not re-encrypted on every save
+        self._encrypted_cache: Dict[str, Dict[str, Tuple[bytes, str]]] = {}
+        # Providers changed since the last save
+        self._dirty: Set[str] = set()
+
+        # Derived views, rebuilt only after credentials change. Masked entries remember the
+        # credentials object they were built from and are dropped once it is replaced.
+        self._masked_cache: Dict[str, Tuple[ProviderCredentials, Dict[str, Any]]] = {}
+        self._provider_ids: Optional[Tuple[str, ...]] = None
+
+        # Existing credentials are loaded on first access. The dict is copy-on-write: writers build
+        # a new one and swap the reference under _write_lock, so readers never need the lock
         self._credentials: Dict[str, ProviderCredentials] = {}
-        self._load_credentials()
+        # Process-only credentials (synced from request headers), consulted before the stored ones
+        # and never written to disk. Copy-on-write like _credentials.
+        self._in_memory_credentials: Dict[str, ProviderCredentials] = {}
+        self._loaded = False
+        self._write_lock = threading.Lock()
+
+    @property
+    def _cipher(self):
+        """Fernet cipher, created on first use."""
+        if self._fernet is None:
+            from cryptography.fernet import Fernet
+            self._fernet = Fernet(self._get_or_create_encryption_key())
+        return self._fernet
+
+    def _ensure_loaded(self):
+        """Load credentials from the configuration file on first access."""
+        if not self._loaded:
+            with self._write_lock:
+                if not self._loaded:
+                    self._load_credentials()
+                    self._loaded = True
     
     def _get_or_create_encryption_key(self) -> bytes:
         """Get existing encryption key or create a new one."""
+        cached_key = _KEY_CACHE.get(self.key_file)
+        if cached_key:
+            return cached_key
+
         if self.key_file.exists():
             try:
                 with open(self.key_file, 'rb') as f:
-                    return f.read()
+                    key = f.read()
+                _KEY_CACHE[self.key_file] = key
+                return key
             except Exception as e:
                 logger.warning(f"Failed to read encryption key: {e}. Creating new key.")
         
         # Create new encryption key
+        from cryptography.fernet import Fernet
         key = Fernet.generate_key()
         try:
             with open(self.key_file, 'wb') as f:
                 f.write(key)
             # Make key file readable only by owner
             os.chmod(self.key_file, 0o600)
+            _KEY_CACHE[self.key_file] = key
         except Exception as e:
             logger.error(f"Failed to save encryption key: {e}")
         
@@ -83,8 +164,8 @@ class CredentialManager:
         if not data:
             return data
         try:
-            encrypted = self._cipher.encrypt(data.encode())
-            return base64.b64encode(encrypted).decode()
+            # Fernet tokens are already urlsafe base64, so they can be stored as-is
+            return self._cipher.encrypt(data.encode()).decode('ascii')
         except Exception as e:
             logger.error(f"Encryption failed: {e}")
             return data
@@ -94,13 +175,36 @@ class CredentialManager:
         if not encrypted_data:
             return encrypted_data
         try:
-            decoded = base64.b64decode(encrypted_data.encode())
-            decrypted = self._cipher.decrypt(decoded)
-            return decrypted.decode()
+            token = encrypted_data.encode('ascii')
+            if self._is_legacy_token(encrypted_data):
+                token = base64.b64decode(token)
+            return self._cipher.decrypt(token).decode()
         except Exception as e:
             logger.error(f"Decryption failed: {e}")
             return encrypted_data
     
+    @staticmethod
+    def _is_legacy_token(encrypted_data: str) -> bool:
+        """Whether a stored value uses the old double base64 encoding."""
+        return not encrypted_data.startswith(FERNET_TOKEN_PREFIX)
+
+    @staticmethod
+    def _hash_secret(value: str) -> bytes:
+        """Hash a plaintext secret for change detection."""
+        return hashlib.sha256(value.encode()).digest()
+
+    def _encrypt_field(self, provider_id: str, field: str, value: str) -> str:
+        """Encrypt a sensitive field, reusing the cached ciphertext when the plaintext is unchanged."""
+        value_hash = self._hash_secret(value)
+        provider_cache = self._encrypted_cache.setdefault(provider_id, {})
+        cached = provider_cache.get(field)
+        if cached and cached[0] == value_hash:
+            return cached[1]
+
+        encrypted = self._encrypt(value)
+        provider_cache[field] = (value_hash, encrypted)
+        return encrypted
+
     def _load_credentials(self):
         """Load credentials from configuration file."""
         if not self.config_file.exists():
@@ -108,47 +212,74 @@ class CredentialManager:
             return
         
         try:
-            with open(self.config_file, 'r') as f:
-                data = json.load(f)
-            
-            for provider_id, cred_data in data.items():
-                # Decrypt sensitive fields
-                if cred_data.get('api_key'):
-                    cred_data['api_key'] = self._decrypt(cred_data['api_key'])
-                if cred_data.get('secret_access_key'):
-                    cred_data['secret_access_key'] = self._decrypt(cred_data['secret_access_key'])
-                if cred_data.get('service_account_json'):
-                    cred_data['service_account_json'] = self._decrypt(cred_data['service_account_json'])
-                
-                self._credentials[provider_id] = ProviderCredentials(**cred_data)
-            
+            loaded = {}
+            # Reuse the contents another instance already parsed while the file is unchanged
+            mtime_ns = self.config_file.stat().st_mtime_ns
+            cached_file = _CREDENTIALS_FILE_CACHE.get(self.config_file)
+            if cached_file and cached_file[0] == mtime_ns:
+                data = cached_file[1]
+            else:
+                with open(self.config_file, 'rb') as f:
+                    raw = f.read()
+                data = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+                _CREDENTIALS_FILE_CACHE[self.config_file] = (mtime_ns, data)
+
+            for provider_id, stored_data in data.items():
+                # Decrypt a copy - the parsed contents are shared through the file cache
+                cred_data = dict(stored_data)
+                # Decrypt sensitive fields, remembering the stored ciphertext for later saves
+                # (legacy-encoded values aren't remembered, so the next save rewrites them)
+                provider_cache = self._encrypted_cache.setdefault(provider_id, {})
+                for field in SENSITIVE_FIELDS:
+                    if cred_data.get(field):
+                        encrypted = cred_data[field]
+                        cred_data[field] = self._decrypt(encrypted)
+                        if not self._is_legacy_token(encrypted):
+                            provider_cache[field] = (self._hash_secret(cred_data[field]), encrypted)
+
+                loaded[provider_id] = ProviderCredentials(**cred_data)
+
+            self._credentials = loaded
             logger.info(f"Loaded credentials for {len(self._credentials)} providers")
         except Exception as e:
             logger.error(f"Failed to load credentials: {e}")
     
     def _save_credentials(self):
-        """Save credentials to configuration file."""
+        """
+        Save credentials to configuration file if any provider changed since the last save.
+
+        Must be called with _write_lock held.
+        """
+        if not self._dirty:
+            return
+
         try:
+            credentials = self._credentials
             data = {}
-            for provider_id, creds in self._credentials.items():
-                cred_dict = asdict(creds)
-                
+            for provider_id, creds in credentials.items():
+                cred_dict = creds.to_dict()
+
                 # Encrypt sensitive fields
-                if cred_dict.get('api_key'):
-                    cred_dict['api_key'] = self._encrypt(cred_dict['api_key'])
-                if cred_dict.get('secret_access_key'):
-                    cred_dict['secret_access_key'] = self._encrypt(cred_dict['secret_access_key'])
-                if cred_dict.get('service_account_json'):
-                    cred_dict['service_account_json'] = self._encrypt(cred_dict['service_account_json'])
-                
+                for field in SENSITIVE_FIELDS:
+                    if cred_dict.get(field):
+                        cred_dict[field] = self._encrypt_field(provider_id, field, cred_dict[field])
+
                 data[provider_id] = cred_dict
             
-            with open(self.config_file, 'w') as f:
-                json.dump(data, f, indent=2)
-            
-            # Make config file readable only by owner
-            os.chmod(self.config_file, 0o600)
-            logger.info(f"Saved credentials for {len(self._credentials)} providers")
+            # Write to a temporary file (readable only by owner) and swap it in atomically,
+            # so a crash mid-write never leaves a truncated credentials file behind
+            if ORJSON_AVAILABLE:
+                payload = orjson.dumps(data)
+            else:
+                payload = json.dumps(data, separators=(',', ':')).encode('utf-8')
+            tmp_file = self.config_file.with_suffix('.json.tmp')
+            with open(os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb') as f:
+                f.write(payload)
+            os.chmod(tmp_file, 0o600)
+            os.replace(tmp_file, self.config_file)
+            _CREDENTIALS_FILE_CACHE[self.config_file] = (self.config_file.stat().st_mtime_ns, data)
+            self._dirty.clear()
+            logger.info(f"Saved credentials for {len(credentials)} providers")
         except Exception as e:
             logger.error(f"Failed to save credentials: {e}")
             raise
@@ -165,43 +296,82 @@ class CredentialManager:
             True if successful, False otherwise
         """
         try:
-            # Get existing credentials if any
-            existing = self._credentials.get(provider_id)
-
-            # If updating existing credentials, merge with new values
-            if existing:
-                existing_dict = asdict(existing)
-                # Update only provided fields
-                for key, value in credentials.items():
-                    if value is not None and value != '':
-                        existing_dict[key] = value
-
-                creds = ProviderCredentials(**existing_dict)
-            else:
-                # Create new ProviderCredentials object
-                creds = ProviderCredentials(
-                    provider_id=provider_id,
-                    api_key=credentials.get('api_key'),
-                    endpoint=credentials.get('endpoint'),
-                    deployment_name=credentials.get('deployment_name'),
-                    api_version=credentials.get('api_version'),
-                    model_name=credentials.get('model_name'),
-                    region=credentials.get('region'),
-                    project_id=credentials.get('project_id'),
-                    access_key_id=credentials.get('access_key_id'),
-                    secret_access_key=credentials.get('secret_access_key'),
-                    service_account_json=credentials.get('service_account_json'),
-                    custom_params=credentials.get('custom_params')
-                )
-
-            self._credentials[provider_id] = creds
-            self._save_credentials()
+            self._ensure_loaded()
+            with self._write_lock:
+                # Get existing credentials if any
+                existing = self._credentials.get(provider_id)
+
+                # If updating existing credentials, merge with new values
+                if existing:
+                    # Update only provided fields
+                    updates = {
+                        key: value for key, value in credentials.items()
+                        if value is not None and value != ''
+                    }
+                    creds = replace(existing, **updates)
+                else:
+                    # Create new ProviderCredentials object
+                    creds = ProviderCredentials(
+                        provider_id=provider_id,
+                        api_key=credentials.get('api_key'),
+                        endpoint=credentials.get('endpoint'),
+                        deployment_name=credentials.get('deployment_name'),
+                        api_version=credentials.get('api_version'),
+                        model_name=credentials.get('model_name'),
+                        region=credentials.get('region'),
+                        project_id=credentials.get('project_id'),
+                        access_key_id=credentials.get('access_key_id'),
+                        secret_access_key=credentials.get('secret_access_key'),
+                        service_account_json=credentials.get('service_account_json'),
+                        custom_params=credentials.get('custom_params')
+                    )
+
+                if creds != existing:
+                    credentials_copy = dict(self._credentials)
+                    credentials_copy[provider_id] = creds
+                    self._credentials = credentials_copy
+                    self._provider_ids = None
+                    self._dirty.add(provider_id)
+                # Explicitly saved credentials take over from process-only ones
+                self._drop_in_memory_credentials(provider_id)
+                self._save_credentials()
             logger.info(f"Saved credentials for provider: {provider_id}")
             return True
         except Exception as e:
             logger.error(f"Failed to save credentials for {provider_id}: {e}")
             return False
     
+    def set_in_memory_credentials(self, provider_id: str, credentials: ProviderCredentials):
+        """
+        Use credentials for a provider for this process only, without saving them to disk.
+
+        They are kept apart from the stored credentials, so later saves of other providers
+        never write them to the credentials file.
+
+        Args:
+            provider_id: Provider identifier
+            credentials: Credentials to use
+        """
+        self._ensure_loaded()
+        with self._write_lock:
+            if provider_id not in self._credentials and provider_id not in self._in_memory_credentials:
+                self._provider_ids = None
+            in_memory_copy = dict(self._in_memory_credentials)
+            in_memory_copy[provider_id] = credentials
+            self._in_memory_credentials = in_memory_copy
+
+    def _drop_in_memory_credentials(self, provider_id: str):
+        """
+        Forget process-only credentials for a provider.
+
+        Must be called with _write_lock held.
+        """
+        if provider_id in self._in_memory_credentials:
+            in_memory_copy = dict(self._in_memory_credentials)
+            del in_memory_copy[provider_id]
+            self._in_memory_credentials = in_memory_copy
+            self._provider_ids = None
+
     def get_credentials(self, provider_id: str) -> Optional[ProviderCredentials]:
         """
         Get credentials for a provider.
@@ -212,11 +382,10 @@ class CredentialManager:
         Returns:
             ProviderCredentials object or None if not found
         """
-        # Only return stored credentials - no environment variable fallback
-        if provider_id in self._credentials:
-            return self._credentials[provider_id]
+        self._ensure_loaded()
 
-        return None
+        # Only return in-memory or stored credentials - no environment variable fallback
+        return self._in_memory_credentials.get(provider_id) or self._credentials.get(provider_id)
 
     def delete_credentials(self, provider_id: str) -> bool:
         """
@@ -229,19 +398,37 @@ class CredentialManager:
             True if successful, False otherwise
         """
         try:
-            if provider_id in self._credentials:
-                del self._credentials[provider_id]
+            self._ensure_loaded()
+            with self._write_lock:
+                had_in_memory = provider_id in self._in_memory_credentials
+                self._drop_in_memory_credentials(provider_id)
+                if provider_id not in self._credentials:
+                    if had_in_memory:
+                        self._masked_cache.pop(provider_id, None)
+                    return had_in_memory
+                credentials_copy = dict(self._credentials)
+                del credentials_copy[provider_id]
+                self._credentials = credentials_copy
+                self._encrypted_cache.pop(provider_id, None)
+                self._masked_cache.pop(provider_id, None)
+                self._provider_ids = None
+                self._dirty.add(provider_id)
                 self._save_credentials()
-                logger.info(f"Deleted credentials for provider: {provider_id}")
-                return True
-            return False
+            logger.info(f"Deleted credentials for provider: {provider_id}")
+            return True
         except Exception as e:
             logger.error(f"Failed to delete credentials for {provider_id}: {e}")
             return False
     
     def list_configured_providers(self) -> list:
         """Get list of providers with configured credentials."""
-        return list(self._credentials.keys())
+        self._ensure_loaded()
+        if self._provider_ids is None:
+            self._provider_ids = tuple(self._credentials) + tuple(
+                provider_id for provider_id in self._in_memory_credentials
+                if provider_id not in self._credentials
+            )
+        return list(self._provider_ids)
     
     def get_masked_credentials(self, provider_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -256,8 +443,12 @@ class CredentialManager:
         creds = self.get_credentials(provider_id)
         if not creds:
             return None
-        
-        masked = asdict(creds)
+
+        cached = self._masked_cache.get(provider_id)
+        if cached and cached[0] is creds:
+            return dict(cached[1])
+
+        masked = creds.to_dict()
         
         # Mask sensitive fields
         if masked.get('api_key'):
@@ -266,14 +457,17 @@ class CredentialManager:
             masked['secret_access_key'] = self._mask_value(masked['secret_access_key'])
         if masked.get('service_account_json'):
             masked['service_account_json'] = '***CONFIGURED***'
-        
-        return masked
+
+        self._masked_cache[provider_id] = (creds, masked)
+        return dict(masked)
     
     def _mask_value(self, value: str, visible_chars: int = 4) -> str:
         """Mask a sensitive value, showing only last few characters."""
         if not value or len(value) <= visible_chars:
             return '***'
-        return '*' * (len(value) - visible_chars) + value[-visible_chars:]
+        # Cap the mask width so long secrets (JWTs, tokens) don't produce long masked strings
+        mask_width = min(len(value) - visible_chars, MAX_MASK_WIDTH)
+        return f"{'*' * mask_width}{value[-visible_chars:]}"
 
 
 # Global credential manager instance
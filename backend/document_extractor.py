@@ -10,17 +10,106 @@ Supported formats:
 """
 
 import re
-import pandas as pd
-import PyPDF2
 import fitz  # PyMuPDF
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, Side
 from pathlib import Path
 import logging
+from dataclasses import dataclass
 from typing import List, Dict, Tuple, Optional
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Regular expressions are compiled once at import - they run against every line of every page
+
+# Valid Roman numeral
+_ROMAN_NUMERAL_RE = re.compile(r'^M{0,3}(CM|CD|D?C{0,3})(XC|XL|L?X{0,3})(IX|IV|V?I{0,3})$')
+
+# Table of contents lines ending in a page number, matched over a whole page at once. The
+# alternatives are tried in order and the outer group name (match.lastgroup) says which kind of
+# numbering matched. Whitespace is [^\S\n] so a match never runs into the next line.
+_TOC_SPACE = r'[^\S\n]'
+_TOC_LEADER = r'(?:[^\S\n]|\.){3,}'
+_TOC_LINE_RE = re.compile(
+    r'^' + _TOC_SPACE + r'*(?:'
+    r'(?P<numbered>(?P<numbered_number>(?:\d+\.)+\d*)' + _TOC_SPACE + r'+(?P<numbered_title>.+?)'
+    + _TOC_LEADER + r'(?P<numbered_page>\d+))'
+    r'|(?P<chapter>(?P<chapter_word>Chapter|CHAPTER)' + _TOC_SPACE + r'+(?P<chapter_number>\d+)(?:'
+    + _TOC_SPACE + r'|[:\.])+(?P<chapter_title>.+?)' + _TOC_LEADER + r'(?P<chapter_page>\d+))'
+    r'|(?P<roman>(?P<roman_number>[IVXLCDM]+\.?)' + _TOC_SPACE + r'+(?P<roman_title>.+?)'
+    + _TOC_LEADER + r'(?P<roman_page>\d+))'
+    r'|(?P<simple>(?P<simple_number>\d+)' + _TOC_SPACE + r'+(?P<simple_title>.+?)'
+    + _TOC_LEADER + r'(?P<simple_page>\d+))'
+    r')' + _TOC_SPACE + r'*$',
+    re.MULTILINE
+)
+
+# Patterns to identify different heading levels - CORRECTED for academic documents
+_HEADING_PATTERNS = {
+    'section': [
+        re.compile(r'^(\d+)\s+(.+)$'),  # 1 Chapter Title (single digit for chapters)
+        re.compile(r'^(Chapter\s+\d+)\s*$'),  # Chapter 1 (standalone)
+        re.compile(r'^(Chapter\s+\d+)\s*[:\-]?\s*(.+)$'),  # Chapter 1: Title
+        re.compile(r'^(CHAPTER\s+\d+)\s*[:\-]?\s*(.+)$'),  # CHAPTER 1: Title
+    ],
+    'subsection': [
+        re.compile(r'^(\d+\.\d+)\s*$'),  # 1.1 (standalone number)
+        re.compile(r'^(\d+\.\d+)\s+(.+)$'),  # 1.1 Section Title
+    ],
+    'subsubsection': [
+        re.compile(r'^(\d+\.\d+\.\d+)\s*$'),  # 1.1.1 (standalone number)
+        re.compile(r'^(\d+\.\d+\.\d+)\s+(.+)$'),  # 1.1.1 Subsection Title
+    ],
+    'subsubsubsection': [
+        re.compile(r'^(\d+\.\d+\.\d+\.\d+)\s*$'),  # 1.1.1.1 (standalone number)
+        re.compile(r'^(\d+\.\d+\.\d+\.\d+)\s+(.+)$'),  # 1.1.1.1 Subsubsection Title
+    ]
+}
+
+# Every heading pattern above starts with a digit or "Chapter"/"CHAPTER", so lines that
+# don't can be rejected with one match instead of trying each pattern in turn
+_HEADING_START_RE = re.compile(r'\d|Chapter|CHAPTER')
+
+# Heading "titles" made up only of digits, dots and spaces are table data
+_NUMERIC_ONLY_RE = re.compile(r'^[\d\.\s]+$')
+
+# Heading "titles" that are really tables (case-sensitive 'Table'), figure captions or references
+_NON_HEADING_TITLE_RE = re.compile(r'(?-i:Table)|figure|illustration|reward trends', re.IGNORECASE)
+
+# Front/back matter lines the regex method skips (matched anywhere in the lowercased line)
+_SKIP_LINE_RE = re.compile('|'.join(map(re.escape, [
+    'contents', 'list of figures', 'list of tables', 'acknowledgments',
+    'dedication', 'abstract', 'bibliography', 'references', 'acronyms'
+])))
+
+# Content lines made up only of digits, dots and spaces (page numbers, table figures)
+_DIGITS_AND_DOTS_RE = re.compile(r'[. ]*\d[\d. ]*')
+
+# str.translate table turning tabs into spaces in content lines
+_TAB_TO_SPACE = str.maketrans('\t', ' ')
+
+# str.translate table deleting the control characters Excel rejects (everything below 0x20
+# except tab, newline and carriage return - this covers null bytes, vertical tab and form feed)
+_EXCEL_ILLEGAL_CHARS = {code: None for code in range(0x20) if code not in (0x09, 0x0A, 0x0D)}
+
+# Punctuation that differs between TOC titles and the headings in the text, removed before matching
+_MATCH_PUNCTUATION = str.maketrans('', '', ':.,')
+
+# Lone surrogates can't be encoded as UTF-8 (Python strings never hold surrogate pairs)
+_SURROGATE_RE = re.compile('[\ud800-\udfff]')
+
+
+@dataclass(frozen=True)
+class _NormalizedTitle:
+    """Forms of a section title used for fuzzy matching, computed once instead of per line."""
+    title: str
+    lower: str
+    normalized: str
+    significant_words: Tuple[str, ...]
+
 
 class DocumentExtractor:
     """Extract content from PDF documents."""
@@ -31,24 +120,30 @@ class DocumentExtractor:
     }
 
     @staticmethod
-    def extract_document_name_from_pdf(pdf_path: str) -> str:
+    def extract_document_name_from_pdf(pdf_path: str, doc: Optional[fitz.Document] = None, first_page_text: Optional[str] = None) -> str:
         """
         Extract document name from PDF.
         First tries to get it from the first page text, then falls back to filename.
 
         Args:
             pdf_path: Path to the PDF file
+            doc: Already opened document to read instead of opening pdf_path again (left open)
+            first_page_text: Text already extracted from the first page, so the PDF isn't read at all
 
         Returns:
             str: Document name
         """
+        owns_doc = doc is None and first_page_text is None
         try:
-            doc = fitz.open(pdf_path)
-            if doc.page_count > 0:
+            if first_page_text is None:
+                if owns_doc:
+                    doc = fitz.open(pdf_path)
                 # Get text from first page
-                first_page = doc[0]
-                text = first_page.get_text()
-                lines = text.split('\n')
+                first_page_text = doc[0].get_text() if doc.page_count > 0 else ""
+
+            if first_page_text:
+                # Only the first few lines can hold the title, so the rest of the page isn't split
+                lines = first_page_text.split('\n', 10)
 
                 # Look for a title in the first few lines (skip empty lines)
                 for line in lines[:10]:
@@ -56,20 +151,13 @@ class DocumentExtractor:
                     # Skip very short lines, page numbers, and common headers
                     if len(line) > 10 and not line.isdigit() and not line.lower().startswith(('page', 'chapter')):
                         # This is likely the document title
-                        doc.close()
                         # Clean the text for Excel compatibility
-                        cleaned = []
-                        for char in line:
-                            code = ord(char)
-                            if code >= 0x20 or code in (0x09, 0x0A, 0x0D):
-                                cleaned.append(char)
-                        result = ''.join(cleaned)
-                        result = result.replace('\x00', '').replace('\x0b', '').replace('\x0c', '')
-                        return result.encode('utf-8', errors='ignore').decode('utf-8', errors='ignore')
-
-            doc.close()
+                        return DocumentExtractor._clean_text_for_excel(line)
         except Exception as e:
             logger.debug(f"Could not extract document name from first page: {e}")
+        finally:
+            if owns_doc and doc is not None:
+                doc.close()
 
         # Fallback to filename without extension
         return Path(pdf_path).stem
@@ -79,32 +167,12 @@ class DocumentExtractor:
         """Check if string is a valid Roman numeral."""
         if not s:
             return False
-        # Valid Roman numeral pattern
-        pattern = r'^M{0,3}(CM|CD|D?C{0,3})(XC|XL|L?X{0,3})(IX|IV|V?I{0,3})$'
-        return bool(re.match(pattern, s.upper()))
+        return bool(_ROMAN_NUMERAL_RE.match(s.upper()))
 
     def __init__(self):
-        # Patterns to identify different heading levels - CORRECTED for academic documents
-        self.heading_patterns = {
-            'section': [
-                r'^(\d+)\s+(.+)$',  # 1 Chapter Title (single digit for chapters)
-                r'^(Chapter\s+\d+)\s*$',  # Chapter 1 (standalone)
-                r'^(Chapter\s+\d+)\s*[:\-]?\s*(.+)$',  # Chapter 1: Title
-                r'^(CHAPTER\s+\d+)\s*[:\-]?\s*(.+)$',  # CHAPTER 1: Title
-            ],
-            'subsection': [
-                r'^(\d+\.\d+)\s*$',  # 1.1 (standalone number)
-                r'^(\d+\.\d+)\s+(.+)$',  # 1.1 Section Title
-            ],
-            'subsubsection': [
-                r'^(\d+\.\d+\.\d+)\s*$',  # 1.1.1 (standalone number)
-                r'^(\d+\.\d+\.\d+)\s+(.+)$',  # 1.1.1 Subsection Title
-            ],
-            'subsubsubsection': [
-                r'^(\d+\.\d+\.\d+\.\d+)\s*$',  # 1.1.1.1 (standalone number)
-                r'^(\d+\.\d+\.\d+\.\d+)\s+(.+)$',  # 1.1.1.1 Subsubsection Title
-            ]
-        }
+        # Heading patterns by level, checked in order (most specific first)
+        self.heading_patterns = _HEADING_PATTERNS
+        self._heading_pattern_items = list(self.heading_patterns.items())
     
     @classmethod
     def get_supported_extensions(cls) -> set:
@@ -135,15 +203,10 @@ class DocumentExtractor:
         """Extract text from PDF using PyMuPDF."""
         try:
             doc = fitz.open(pdf_path)
-            pages_text = []
-
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                text = page.get_text()
-                pages_text.append(text)
-                logger.info(f"Extracted text from PDF page {page_num + 1}")
-
+            pages_text = [page.get_text() for page in doc]
             doc.close()
+
+            logger.info(f"Extracted text from {len(pages_text)} PDF pages")
             return pages_text
 
         except Exception as e:
@@ -151,22 +214,30 @@ class DocumentExtractor:
             # Fallback to PyPDF2
             return self._extract_pdf_with_pypdf2(pdf_path)
 
-    def extract_pdf_toc(self, pdf_path: str) -> List[Dict]:
+    def extract_pdf_toc(self, pdf_path: str, doc: Optional[fitz.Document] = None) -> List[Dict]:
         """
         Extract PDF Table of Contents using multiple methods.
 
         Args:
             pdf_path: Path to PDF file
+            doc: Already opened document to read instead of opening pdf_path again (left open)
 
         Returns:
             List of TOC entries with level, title, and page
         """
+        owns_doc = doc is None
         try:
             logger.info(f"Analyzing PDF: {Path(pdf_path).name}")
+            if owns_doc:
+                try:
+                    doc = fitz.open(pdf_path)
+                except Exception as e:
+                    # The PyMuPDF methods fail on their own below; PyPDF2 may still read the file
+                    logger.debug(f"PyMuPDF could not open PDF: {e}")
 
             # Method 1: Try PyMuPDF TOC
             logger.info("[1] Attempting extraction with PyMuPDF...")
-            toc = self._extract_toc_pymupdf(pdf_path)
+            toc = self._extract_toc_pymupdf(doc)
             if toc:
                 logger.info(f"✓ Successfully extracted {len(toc)} TOC entries")
                 return toc
@@ -180,7 +251,7 @@ class DocumentExtractor:
 
             # Method 3: Try text-based detection
             logger.info("[3] Attempting text-based TOC detection...")
-            toc = self._detect_toc_from_text(pdf_path)
+            toc = self._detect_toc_from_text(doc)
             if toc:
                 logger.info(f"✓ Detected {len(toc)} potential TOC entries")
                 return toc
@@ -191,13 +262,14 @@ class DocumentExtractor:
         except Exception as e:
             logger.error(f"Error extracting PDF TOC: {e}")
             return []
+        finally:
+            if owns_doc and doc is not None:
+                doc.close()
 
-    def _extract_toc_pymupdf(self, pdf_path: str) -> List[Dict]:
+    def _extract_toc_pymupdf(self, doc: fitz.Document) -> List[Dict]:
         """Extract TOC using PyMuPDF (more reliable for embedded TOC)"""
         try:
-            doc = fitz.open(pdf_path)
             toc = doc.get_toc()
-            doc.close()
 
             if not toc:
                 return []
@@ -210,6 +282,9 @@ class DocumentExtractor:
     def _extract_toc_pypdf2(self, pdf_path: str) -> List[Dict]:
         """Extract TOC using PyPDF2 (reads PDF bookmarks/outlines)"""
         try:
+            # PyPDF2 is only a fallback, so it is imported on first use
+            import PyPDF2
+
             with open(pdf_path, 'rb') as file:
                 reader = PyPDF2.PdfReader(file)
                 outlines = reader.outline
@@ -219,20 +294,27 @@ class DocumentExtractor:
 
                 toc = []
 
-                def parse_outline(outline_items, level=1):
+                # Walk the nested outline lists depth-first with an explicit stack of
+                # (iterator, level), so deep outlines don't recurse
+                stack = [(iter(outlines), 1)]
+                while stack:
+                    outline_items, level = stack[-1]
                     for item in outline_items:
                         if isinstance(item, list):
-                            parse_outline(item, level + 1)
-                        else:
-                            title = item.title if hasattr(item, 'title') else str(item)
-                            page = reader.get_destination_page_number(item) + 1 if hasattr(item, 'page') else None
-                            toc.append({
-                                'title': title,
-                                'page': page,
-                                'level': level
-                            })
+                            # Descend into the nested list, resuming this one afterwards
+                            stack.append((iter(item), level + 1))
+                            break
+
+                        title = item.title if hasattr(item, 'title') else str(item)
+                        page = reader.get_destination_page_number(item) + 1 if hasattr(item, 'page') else None
+                        toc.append({
+                            'title': title,
+                            'page': page,
+                            'level': level
+                        })
+                    else:
+                        stack.pop()
 
-                parse_outline(outlines)
                 return toc
         except Exception as e:
             logger.debug(f"PyPDF2 extraction failed: {e}")
@@ -249,99 +331,71 @@ class DocumentExtractor:
 
         return level
 
-    def _detect_toc_from_text(self, pdf_path: str, max_pages: int = 20) -> List[Dict]:
+    def _detect_toc_from_text(self, doc: fitz.Document, max_pages: int = 20) -> List[Dict]:
         """Attempt to detect TOC by analyzing text content in first pages"""
         try:
-            doc = fitz.open(pdf_path)
-
-            toc_patterns = [
-                (r'^((?:\d+\.)+\d*)\s+(.+?)[\s\.]{3,}(\d+)$', 'numbered'),
-                (r'^((?:\d+\.)+)\s+(.+?)[\s\.]{3,}(\d+)$', 'numbered'),
-                (r'^(Chapter|CHAPTER)\s+(\d+)[\s:\.]+(.+?)[\s\.]{3,}(\d+)$', 'chapter'),
-                (r'^([IVXLCDM]+\.?)\s+(.+?)[\s\.]{3,}(\d+)$', 'roman'),
-                (r'^(\d+)\s+(.+?)[\s\.]{3,}(\d+)$', 'simple'),
-            ]
-
             toc = []
 
             for page_num in range(min(max_pages, doc.page_count)):
-                page = doc[page_num]
-                text = page.get_text()
-                lines = text.split('\n')
-
-                for line in lines:
-                    line = line.strip()
-                    if not line or len(line) < 10:
+                for match in _TOC_LINE_RE.finditer(doc[page_num].get_text()):
+                    # Skip short lines
+                    if len(match.group().strip()) < 10:
                         continue
 
-                    for pattern, pattern_type in toc_patterns:
-                        match = re.match(pattern, line)
-                        if match:
-                            groups = match.groups()
-
-                            if pattern_type == 'numbered':
-                                numbering = groups[0]
-                                title = groups[1].strip()
-                                page_no = int(groups[2])
-                                level = self._calculate_hierarchy_level(numbering)
-
-                                toc.append({
-                                    'level': level,
-                                    'title': f"{numbering} {title}",
-                                    'page': page_no,
-                                    'numbering': numbering
-                                })
-
-                            elif pattern_type == 'chapter':
-                                toc.append({
-                                    'level': 1,
-                                    'title': f"{groups[0]} {groups[1]}: {groups[2]}",
-                                    'page': int(groups[3]),
-                                    'numbering': groups[1]
-                                })
-
-                            elif pattern_type == 'roman' or pattern_type == 'simple':
-                                numbering = groups[0].rstrip('.')
-                                title = groups[1].strip()
-                                page_no = int(groups[2])
-
-                                toc.append({
-                                    'level': 1,
-                                    'title': f"{numbering}. {title}",
-                                    'page': page_no,
-                                    'numbering': numbering
-                                })
+                    pattern_type = match.lastgroup
+
+                    if pattern_type == 'numbered':
+                        numbering = match.group('numbered_number')
+                        title = match.group('numbered_title').strip()
+                        page_no = int(match.group('numbered_page'))
+                        level = self._calculate_hierarchy_level(numbering)
+
+                        toc.append({
+                            'level': level,
+                            'title': f"{numbering} {title}",
+                            'page': page_no,
+                            'numbering': numbering
+                        })
+
+                    elif pattern_type == 'chapter':
+                        toc.append({
+                            'level': 1,
+                            'title': f"{match.group('chapter_word')} {match.group('chapter_number')}: {match.group('chapter_title')}",
+                            'page': int(match.group('chapter_page')),
+                            'numbering': match.group('chapter_number')
+                        })
 
-                            break
+                    else:
+                        # Roman numeral or simple numbering
+                        numbering = match.group(f'{pattern_type}_number').rstrip('.')
+                        title = match.group(f'{pattern_type}_title').strip()
+                        page_no = int(match.group(f'{pattern_type}_page'))
+
+                        toc.append({
+                            'level': 1,
+                            'title': f"{numbering}. {title}",
+                            'page': page_no,
+                            'numbering': numbering
+                        })
 
-            doc.close()
             return toc if toc else []
         except Exception as e:
             logger.debug(f"Text-based detection failed: {e}")
             return []
 
-    def _clean_text_for_excel(self, text: str) -> str:
+    @staticmethod
+    def _clean_text_for_excel(text: str) -> str:
         """Remove illegal characters for Excel compatibility"""
         if not text:
             return ""
 
         # Remove control characters except tab, newline, and carriage return
-        cleaned = []
-        for char in text:
-            code = ord(char)
-            # Keep printable characters, tab, newline, carriage return
-            if code >= 0x20 or code in (0x09, 0x0A, 0x0D):
-                cleaned.append(char)
+        result = text.translate(_EXCEL_ILLEGAL_CHARS)
 
-        result = ''.join(cleaned)
-
-        # Also remove null bytes and other problematic characters
-        result = result.replace('\x00', '')
-        result = result.replace('\x0b', '')  # Vertical tab
-        result = result.replace('\x0c', '')  # Form feed
-
-        # Replace problematic Unicode characters that might not render
-        result = result.encode('utf-8', errors='ignore').decode('utf-8', errors='ignore')
+        # Drop lone surrogates, which can't be written out. They are rare in extracted text, so
+        # the UTF-8 round-trip only runs when a scan finds one
+        if _SURROGATE_RE.search(result):
+            result = result.encode('utf-8', errors='ignore').decode('utf-8', errors='ignore')
 
         return result
 
@@ -352,64 +406,116 @@ class DocumentExtractor:
         # Remove extra whitespace, normalize to lowercase
         normalized = ' '.join(text.split()).lower()
         # Remove common punctuation that might differ
-        normalized = normalized.replace(':', '').replace('.', '').replace(',', '')
-        return normalized
+        return normalized.translate(_MATCH_PUNCTUATION)
+
+    def _normalize_title(self, title: str) -> _NormalizedTitle:
+        """Precompute the forms of a title that _fuzzy_match_normalized compares lines against."""
+        normalized = self._normalize_text_for_matching(title)
+        return _NormalizedTitle(
+            title=title,
+            lower=title.lower(),
+            normalized=normalized,
+            # Significant words are the ones longer than three characters
+            significant_words=tuple(w for w in normalized.split() if len(w) > 3)
+        )
 
-    def _fuzzy_title_match(self, title: str, line_text: str, threshold: float = 0.7) -> bool:
+    @staticmethod
+    def _fuzzy_match_normalized(title: _NormalizedTitle, line_lower: str, norm_line: str, threshold: float = 0.7) -> bool:
         """
-        Check if title matches line_text using fuzzy matching.
+        Fuzzy title match against a line whose lowercase and normalized forms are already computed.
 
         Args:
-            title: The section title to find
-            line_text: The line of text to check
+            title: Precomputed forms of the section title to find
+            line_lower: The line of text, lowercased
+            norm_line: The line of text, normalized with _normalize_text_for_matching
             threshold: Similarity threshold (0.0 to 1.0)
 
         Returns:
             True if there's a match, False otherwise
         """
         # Exact match (case-insensitive)
-        if title.lower() in line_text.lower():
+        if title.lower in line_lower:
             return True
 
-        # Normalize both strings
-        norm_title = self._normalize_text_for_matching(title)
-        norm_line = self._normalize_text_for_matching(line_text)
-
         # Check normalized match
-        if norm_title in norm_line:
+        if title.normalized in norm_line:
             return True
 
         # Check if significant words from title appear in line
-        title_words = [w for w in norm_title.split() if len(w) > 3]
-        if not title_words:
+        title_words = title.significant_words
+        # Significant words are longer than three characters, so a shorter line can't hold any
+        if not title_words or len(norm_line) < 4:
             return False
 
-        # Count how many significant words match
-        matches = sum(1 for word in title_words if word in norm_line)
-        similarity = matches / len(title_words)
+        # Count how many significant words match, stopping as soon as the outcome is settled
+        word_count = len(title_words)
+        matches = 0
+        for checked, word in enumerate(title_words, 1):
+            if word in norm_line:
+                matches += 1
+                if matches / word_count >= threshold:
+                    return True
+            elif (matches + word_count - checked) / word_count < threshold:
+                return False
+
+        return matches / word_count >= threshold
 
-        return similarity >= threshold
+    def _get_page_lines(self, doc: fitz.Document, page_num: int, page_lines_cache: Optional[Dict[int, List[str]]] = None) -> List[str]:
+        """
+        Get the non-empty text lines of a page, in reading order.
+
+        Args:
+            doc: Opened PDF document
+            page_num: Page index (0-based)
+            page_lines_cache: Lines already extracted from this document, keyed by page index
+
+        Returns:
+            Stripped text of every non-empty line in the page's text blocks
+        """
+        if page_lines_cache is not None and page_num in page_lines_cache:
+            return page_lines_cache[page_num]
+
+        lines = []
+        # Text blocks as (x0, y0, x1, y1, text, block_no, block_type) tuples, with each block's
+        # lines already joined by MuPDF - same extraction flags as the span-level "dict" output
+        for block in doc[page_num].get_text("blocks", flags=11):
+            # Skip image blocks
+            if block[6] != 0:
+                continue
+
+            for line_text in block[4].split("\n"):
+                line_text = line_text.strip()
+                if line_text:
+                    lines.append(line_text)
+
+        if page_lines_cache is not None:
+            page_lines_cache[page_num] = lines
+        return lines
 
-    def _extract_section_content(self, pdf_path: str, section_title: str, start_page: int, end_page: int, next_section_title: Optional[str] = None) -> str:
+    def _scan_section_content(self, doc: fitz.Document, section_match: _NormalizedTitle, start_page: int, end_page: int, next_section_match: Optional[_NormalizedTitle] = None, page_lines_cache: Optional[Dict[int, List[str]]] = None, start_line: int = 0) -> Tuple[str, Optional[Tuple[int, int]]]:
         """
         Extract text content for a specific section with precise boundary detection.
 
-        This method extracts only the content that belongs to the specified section,
-        not the entire page content. It uses position-based extraction to identify
-        where the section starts and stops.
+        Only the lines that belong to the section are returned, not the entire pages it
+        spans: the scan starts at the line matching the section title and stops at the line
+        matching the next section's title.
 
         Args:
-            pdf_path: Path to the PDF file
-            section_title: Title of the current section (to find where it starts)
+            doc: Opened PDF document
+            section_match: Normalized title of the current section (to find where it starts)
             start_page: Page number where the section starts (1-based)
             end_page: Page number where the section ends (1-based), or None for last section
-            next_section_title: Title of the next section (to know where to stop), or None
+            next_section_match: Normalized title of the next section (to know where to stop), or None
+            page_lines_cache: Page lines shared between the sections of one document, so pages
+                spanned by several sections are only extracted once
+            start_line: Index of the first line of the start page to scan
 
         Returns:
-            Extracted text content for this section only
+            Tuple of the section content and the (page index, line index) of the line where the
+            next section's title was found, or None if the section ran to the end of its pages
         """
         try:
-            doc = fitz.open(pdf_path)
+            section_title = section_match.title
             text_content = []
             section_started = False
             lines_checked = 0
@@ -420,58 +526,45 @@ class DocumentExtractor:
             end_idx = min(end_page, doc.page_count) if end_page else doc.page_count
 
             for page_num in range(start_idx, end_idx):
-                page = doc[page_num]
-
-                # Get text blocks with position information
-                blocks = page.get_text("dict", flags=11)["blocks"]
-
-                for block in blocks:
-                    # Skip image blocks
-                    if block.get("type") != 0:
-                        continue
-
-                    # Process text blocks
-                    for line in block.get("lines", []):
-                        line_text = ""
-                        for span in line.get("spans", []):
-                            line_text += span.get("text", "")
-
-                        line_text = line_text.strip()
-                        if not line_text:
+                page_lines = self._get_page_lines(doc, page_num, page_lines_cache)
+                first_line = start_line if page_num == start_idx else 0
+                for line_index in range(first_line, len(page_lines)):
+                    line_text = page_lines[line_index]
+
+                    # Normalize the line once for both title checks
+                    line_lower = line_text.lower()
+                    norm_line = self._normalize_text_for_matching(line_text)
+
+                    # Check if this is the start of our section
+                    if not section_started:
+                        lines_checked += 1
+
+                        # Use fuzzy matching to find the section title
+                        if self._fuzzy_match_normalized(section_match, line_lower, norm_line):
+                            section_started = True
+                            logger.debug(f"Found section start: '{section_title}' matched '{line_text}'")
+                            # Don't include the title itself in the content
                             continue
 
-                        # Check if this is the start of our section
-                        if not section_started:
-                            lines_checked += 1
-
-                            # Use fuzzy matching to find the section title
-                            if self._fuzzy_title_match(section_title, line_text):
-                                section_started = True
-                                logger.debug(f"Found section start: '{section_title}' matched '{line_text}'")
-                                # Don't include the title itself in the content
-                                continue
-
-                            # If we've checked many lines and still haven't found the title,
-                            # start extracting anyway (fallback behavior)
-                            if lines_checked > max_lines_to_check and page_num == start_idx:
-                                logger.warning(f"Could not find exact title match for '{section_title}' on page {start_page}, extracting from start of page")
-                                section_started = True
-                                # Include this line since we're starting extraction
-
-                        # Check if we've reached the next section
-                        if section_started and next_section_title:
-                            if self._fuzzy_title_match(next_section_title, line_text):
-                                # We've reached the next section, stop here
-                                logger.debug(f"Found next section: '{next_section_title}' matched '{line_text}'")
-                                doc.close()
-                                raw_text = "\n".join(text_content)
-                                return self._clean_text_for_excel(raw_text)
-
-                        # Add content if we're in the section
-                        if section_started:
-                            text_content.append(line_text)
+                        # If we've checked many lines and still haven't found the title,
+                        # start extracting anyway (fallback behavior)
+                        if lines_checked > max_lines_to_check and page_num == start_idx:
+                            logger.warning(f"Could not find exact title match for '{section_title}' on page {start_page}, extracting from start of page")
+                            section_started = True
+                            # Include this line since we're starting extraction
+
+                    # Check if we've reached the next section
+                    if section_started and next_section_match:
+                        if self._fuzzy_match_normalized(next_section_match, line_lower, norm_line):
+                            # We've reached the next section, stop here
+                            logger.debug(f"Found next section: '{next_section_match.title}' matched '{line_text}'")
+                            raw_text = "\n".join(text_content)
+                            return self._clean_text_for_excel(raw_text), (page_num, line_index)
+
+                    # Add content if we're in the section
+                    if section_started:
+                        text_content.append(line_text)
 
-            doc.close()
             raw_text = "\n".join(text_content)
 
             # Log if we got empty content
@@ -479,21 +572,20 @@ class DocumentExtractor:
                 logger.warning(f"Empty content extracted for section '{section_title}' (pages {start_page}-{end_page})")
 
             # Clean text for Excel compatibility
-            return self._clean_text_for_excel(raw_text)
+            return self._clean_text_for_excel(raw_text), None
         except Exception as e:
             logger.error(f"Error extracting section content: {e}")
-            return ""
+            return "", None
 
-    def _extract_text_between_pages(self, pdf_path: str, start_page: int, end_page: int) -> str:
+    def _extract_text_between_pages(self, doc: fitz.Document, start_page: int, end_page: int) -> str:
         """
         Extract text content between two page numbers (legacy method).
 
         WARNING: This method extracts entire pages, which may include content
-        from multiple sections. Use _extract_section_content() for more accurate
+        from multiple sections. Use _scan_section_content() for more accurate
         section-based extraction.
         """
         try:
-            doc = fitz.open(pdf_path)
             text_content = []
 
             # Adjust for 0-based indexing
@@ -503,7 +595,6 @@ class DocumentExtractor:
                 if text.strip():
                     text_content.append(text.strip())
 
-            doc.close()
             raw_text = "\n\n".join(text_content)
 
             # Clean text for Excel compatibility
@@ -516,29 +607,29 @@ class DocumentExtractor:
         """Build hierarchical structure with parent tracking"""
         hierarchy = []
         parent_stack = [None, None, None, None, None]  # Track parents for each level
+        stack_depth = len(parent_stack)
+
+        # The next entry's page is where each section ends (the last one runs to the end)
+        next_pages = [entry['page'] for entry in toc[1:]]
+        next_pages.append(None)
 
-        for i, entry in enumerate(toc):
+        for entry, next_page in zip(toc, next_pages):
             level = entry['level']
             title = entry['title']
-            page = entry['page']
-
-            # Determine the next page (end of this section)
-            next_page = toc[i + 1]['page'] if i + 1 < len(toc) else None
 
             # Update parent stack
             parent_stack[level - 1] = title
-            # Clear deeper levels
-            for j in range(level, len(parent_stack)):
-                parent_stack[j] = None
+            # Clear deeper levels - afterwards every parent below this level is None
+            parent_stack[level:] = [None] * (stack_depth - level)
 
             hierarchy.append({
                 'level': level,
-                'chapter': parent_stack[0] if level >= 1 else None,
-                'section': parent_stack[1] if level >= 2 else None,
-                'subsection': parent_stack[2] if level >= 3 else None,
-                'subsubsection': parent_stack[3] if level >= 4 else None,
+                'chapter': parent_stack[0],
+                'section': parent_stack[1],
+                'subsection': parent_stack[2],
+                'subsubsection': parent_stack[3],
                 'title': title,
-                'start_page': page,
+                'start_page': entry['page'],
                 'end_page': next_page
             })
 
@@ -547,6 +638,9 @@ class DocumentExtractor:
     def _extract_pdf_with_pypdf2(self, pdf_path: str) -> List[str]:
         """Fallback PDF extraction using PyPDF2."""
         try:
+            # PyPDF2 is only a fallback, so it is imported on first use
+            import PyPDF2
+
             with open(pdf_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
                 pages_text = []
@@ -569,13 +663,13 @@ class DocumentExtractor:
         Returns: (level, number, title) or (None, None, None) if not a heading
         """
         line = line.strip()
-        if not line:
+        if not line or not _HEADING_START_RE.match(line):
             return None, None, None
 
         # Check each heading level in order (most specific first)
-        for level, patterns in self.heading_patterns.items():
+        for level, patterns in self._heading_pattern_items:
             for pattern in patterns:
-                match = re.match(pattern, line)
+                match = pattern.match(line)
                 if match:
                     number = match.group(1).strip()
 
@@ -590,12 +684,12 @@ class DocumentExtractor:
                     if '...' in title or title.count('.') > 2:
                         continue
 
-                    # Filter out table data and numeric-only content
-                    if re.match(r'^[\d\.\s]+$', title) or 'Table' in title:
+                    # Filter out numeric-only content
+                    if _NUMERIC_ONLY_RE.match(title):
                         continue
 
-                    # Filter out figure captions and references
-                    if any(word in title.lower() for word in ['figure', 'illustration', 'reward trends']):
+                    # Filter out table data, figure captions and references
+                    if _NON_HEADING_TITLE_RE.search(title):
                         continue
 
                     # Filter out very short titles for sections that should have titles
@@ -622,62 +716,83 @@ class DocumentExtractor:
         Returns:
             List of dictionaries with hierarchical data
         """
-        # Try to use PDF TOC first if it's a PDF file
-        if file_path and file_path.lower().endswith('.pdf'):
-            toc = self.extract_pdf_toc(file_path)
-            if toc:
+        if not (file_path and file_path.lower().endswith('.pdf')):
+            logger.info("Using text-based heading detection (regex patterns)")
+            return self._process_with_regex(pages_text, clean_output, document_name)
+
+        # Open the PDF once and share it between the TOC, document name and section content steps
+        doc = None
+        try:
+            doc = fitz.open(file_path)
+        except Exception as e:
+            logger.error(f"Error opening PDF {file_path}: {e}")
+
+        try:
+            # Resolve the document name once, for whichever processing path runs below:
+            # try the first page, fallback to the provided name
+            extracted_doc_name = self.extract_document_name_from_pdf(file_path, doc, pages_text[0] if pages_text else None)
+            if extracted_doc_name and extracted_doc_name != Path(file_path).stem:
+                # Use extracted name if it's different from filename
+                document_name = extracted_doc_name
+                logger.info(f"Using document name from first page: {document_name}")
+            else:
+                logger.info(f"Using document name: {document_name}")
+
+            # Try to use PDF TOC first
+            toc = self.extract_pdf_toc(file_path, doc)
+            if toc and doc is not None:
                 logger.info(f"Processing PDF with TOC ({len(toc)} entries)")
-                return self._process_with_toc_and_content(file_path, toc, clean_output, document_name)
+                return self._process_with_toc_and_content(doc, toc, clean_output, document_name)
 
-        # Fallback to regex-based detection
-        logger.info("Using text-based heading detection (regex patterns)")
-        return self._process_with_regex(pages_text, clean_output, document_name, file_path)
+            # Fallback to regex-based detection
+            logger.info("Using text-based heading detection (regex patterns)")
+            return self._process_with_regex(pages_text, clean_output, document_name)
+        finally:
+            if doc is not None:
+                doc.close()
 
-    def _process_with_toc_and_content(self, pdf_path: str, toc: List[Dict], clean_output: bool, document_name: str) -> List[Dict]:
+    def _process_with_toc_and_content(self, doc: fitz.Document, toc: List[Dict], clean_output: bool, document_name: str) -> List[Dict]:
         """Process PDF using TOC and extract content for each section"""
         logger.info("Building hierarchical structure and extracting content...")
 
-        # Try to extract document name from first page, fallback to provided name
-        extracted_doc_name = self.extract_document_name_from_pdf(pdf_path)
-        if extracted_doc_name and extracted_doc_name != Path(pdf_path).stem:
-            # Use extracted name if it's different from filename
-            document_name = extracted_doc_name
-            logger.info(f"Using document name from first page: {document_name}")
-        else:
-            logger.info(f"Using document name: {document_name}")
-
         hierarchy = self._build_hierarchy_structure(toc)
         excel_data = []
+        # Consecutive sections share pages, so each page's lines are extracted once and reused.
+        # Sections are processed serially on purpose: PyMuPDF does not support multithreading
+        # (not even with a document per thread), and once pages are cached the remaining
+        # per-section work is pure Python, so a thread pool would not speed it up.
+        page_lines_cache = {}
+        # Where the previous section found this section's title, as (page index, line index)
+        previous_stop = None
+        # Each title is matched against lines as its own section and as the previous section's
+        # end marker, so the normalized forms are computed once for the whole document
+        title_matches = [self._normalize_title(item['title']) for item in hierarchy]
 
         for i, item in enumerate(hierarchy):
             logger.info(f"Processing [{i+1}/{len(hierarchy)}]: {item['title']}")
             logger.info(f"  Pages: {item['start_page']} to {item['end_page'] or 'end'}")
 
             # Determine the next section's title for boundary detection
-            next_section_title = None
+            next_section_match = None
             if i + 1 < len(hierarchy):
-                next_section_title = hierarchy[i + 1]['title']
-
-            # Extract content using position-aware method
-            if item['end_page']:
-                content = self._extract_section_content(
-                    pdf_path,
-                    item['title'],
-                    item['start_page'],
-                    item['end_page'],
-                    next_section_title
-                )
-            else:
-                # Last section - extract to end of document
-                doc = fitz.open(pdf_path)
-                content = self._extract_section_content(
-                    pdf_path,
-                    item['title'],
-                    item['start_page'],
-                    doc.page_count + 1,
-                    next_section_title
-                )
-                doc.close()
+                next_section_match = title_matches[i + 1]
+
+            # Sections are read in one forward sweep: when the previous section stopped at this
+            # section's title on its start page, resume there instead of rescanning the page from the top
+            start_line = 0
+            if previous_stop and previous_stop[0] == item['start_page'] - 1:
+                start_line = previous_stop[1]
+
+            # Extract content using position-aware method (the last section runs to the end of the document)
+            content, previous_stop = self._scan_section_content(
+                doc,
+                title_matches[i],
+                item['start_page'],
+                item['end_page'] or doc.page_count + 1,
+                next_section_match,
+                page_lines_cache,
+                start_line
+            )
 
             # Skip empty content if clean_output is enabled
             if clean_output and not content.strip():
@@ -701,15 +816,8 @@ class DocumentExtractor:
         logger.info(f"✓ Processed {len(excel_data)} sections with content")
         return excel_data
 
-    def _process_with_regex(self, pages_text: List[str], clean_output: bool, document_name: str, file_path: str = "") -> List[Dict]:
+    def _process_with_regex(self, pages_text: List[str], clean_output: bool, document_name: str) -> List[Dict]:
         """Process text using regex pattern matching (fallback method)."""
-        # Try to extract document name from first page if file_path is provided
-        if file_path and file_path.lower().endswith('.pdf'):
-            extracted_doc_name = self.extract_document_name_from_pdf(file_path)
-            if extracted_doc_name and extracted_doc_name != Path(file_path).stem:
-                document_name = extracted_doc_name
-                logger.info(f"Using document name from first page: {document_name}")
-
         hierarchy_data = []
         current_hierarchy = {
             'section': '',
@@ -721,7 +829,8 @@ class DocumentExtractor:
 
         # Process each page separately to maintain context
         for page_num, page_text in enumerate(pages_text):
-            lines = page_text.split('\n')
+            # Strip each line once; it is looked at again as the next line of its predecessor
+            lines = [line.strip() for line in page_text.split('\n')]
             skip_next = False
 
             for i, line in enumerate(lines):
@@ -730,21 +839,16 @@ class DocumentExtractor:
                     skip_next = False
                     continue
 
-                line = line.strip()
-
                 # Skip empty lines, page numbers, headers/footers
                 if not line or line.isdigit() or len(line) < 3:
                     continue
 
                 # Skip common academic document elements
-                if any(skip_word in line.lower() for skip_word in [
-                    'contents', 'list of figures', 'list of tables', 'acknowledgments',
-                    'dedication', 'abstract', 'bibliography', 'references', 'acronyms'
-                ]):
+                if _SKIP_LINE_RE.search(line.lower()):
                     continue
 
                 # Get next line for heading detection
-                next_line = lines[i + 1].strip() if i + 1 < len(lines) else ""
+                next_line = lines[i + 1] if i + 1 < len(lines) else ""
                 level, number, title = self.identify_heading_level(line, next_line)
 
                 if level:
@@ -783,21 +887,15 @@ class DocumentExtractor:
                     logger.info(f"Found {level}: {number} {title}")
 
                     # If title was on next line, mark to skip it in next iteration
-                    if title == next_line.strip():
+                    if title == next_line:
                         skip_next = True
 
-                else:
-                    # Regular content line - only add if we're in a section
-                    if current_hierarchy['section'] and len(line) > 10:
-                        # Clean up the line
-                        cleaned_line = line.replace('\t', ' ').strip()
-                        if cleaned_line and not cleaned_line.replace('.', '').replace(' ', '').isdigit():
-                            current_content.append(cleaned_line)
-                    elif len(line) > 10:
-                        # If we don't have a section yet, still collect content for debugging
-                        cleaned_line = line.replace('\t', ' ').strip()
-                        if cleaned_line and not cleaned_line.replace('.', '').replace(' ', '').isdigit():
-                            current_content.append(cleaned_line)
+                elif len(line) > 10:
+                    # Regular content line - collected even before the first section, for debugging.
+                    # The line is already stripped, so only inner tabs need cleaning up
+                    cleaned_line = line.translate(_TAB_TO_SPACE)
+                    if not _DIGITS_AND_DOTS_RE.fullmatch(cleaned_line):
+                        current_content.append(cleaned_line)
 
         # Don't forget the last content
         if current_content:
@@ -825,6 +923,8 @@ class DocumentExtractor:
 
         # Build page-to-text mapping
         page_texts = {i + 1: text for i, text in enumerate(pages_text)}
+        # Pages usually hold several sections, so each page is split into lines only once
+        page_lines = {}
 
         # Current hierarchy context
         current_section = ""
@@ -845,8 +945,9 @@ class DocumentExtractor:
             content = ""
             if page in page_texts:
                 # Try to find content after this section heading
-                page_text = page_texts[page]
-                lines = page_text.split('\n')
+                lines = page_lines.get(page)
+                if lines is None:
+                    lines = page_lines[page] = page_texts[page].split('\n')
 
                 # Find the heading line
                 for i, line in enumerate(lines):
@@ -961,21 +1062,18 @@ class DocumentExtractor:
                     elif level >= 4:
                         current_subsubsubsection = title
 
-            # Collect content from this page
-            lines = page_text.split('\n')
-            for line in lines:
-                line = line.strip()
-                if line:
-                    # Skip lines that match TOC titles (avoid duplicating headings as content)
-                    is_heading = False
-                    if page_num in page_to_sections:
-                        for section_info in page_to_sections[page_num]:
-                            if section_info['title'] in line:
-                                is_heading = True
-                                break
+            # Blank pages (title pages, separators) have no content to collect
+            if not page_text or page_text.isspace():
+                continue
 
-                    if not is_heading:
-                        current_content.append(line)
+            # Collect content from this page, skipping lines that contain one of the page's
+            # TOC titles (avoid duplicating headings as content)
+            page_titles = [section_info['title'] for section_info in page_to_sections.get(page_num, ())]
+            stripped_lines = (line.strip() for line in page_text.split('\n'))
+            current_content.extend(
+                line for line in stripped_lines
+                if line and not any(title in line for title in page_titles)
+            )
 
         # Save final content
         save_current_content()
@@ -985,70 +1083,73 @@ class DocumentExtractor:
 
     def save_to_excel(self, hierarchy_data: List[Dict], output_path: str):
         """Save hierarchical data to Excel file with enhanced formatting."""
-        df = pd.DataFrame(hierarchy_data)
-
-        # Check if we have the enhanced format (with level, full_title, etc.)
-        has_enhanced_format = 'level' in df.columns and 'full_title' in df.columns
+        # Check if we have the enhanced format (with level, full_title, etc.) - every entry
+        # comes from the same processing method, so the first one tells
+        has_enhanced_format = bool(hierarchy_data) and 'level' in hierarchy_data[0] and 'full_title' in hierarchy_data[0]
 
         if has_enhanced_format:
             # Enhanced format with TOC extraction
             columns = ['document_name', 'level', 'section', 'subsection', 'subsubsection', 'subsubsubsection',
                       'full_title', 'start_page', 'end_page', 'content', 'content_length']
-            for col in columns:
-                if col not in df.columns:
-                    df[col] = ''
-            df = df[columns]
         else:
             # Standard format
             columns = ['document_name', 'section', 'subsection', 'subsubsection', 'subsubsubsection', 'content']
-            for col in columns:
-                if col not in df.columns:
-                    df[col] = ''
-            df = df[columns]
-
-        # Save to Excel with formatting
-        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Extracted_Data', index=False)
-
-            # Get workbook and worksheet
-            workbook = writer.book
-            worksheet = writer.sheets['Extracted_Data']
-
-            if has_enhanced_format:
-                # Adjust column widths for enhanced format
-                worksheet.column_dimensions['A'].width = 30  # document_name
-                worksheet.column_dimensions['B'].width = 8   # level
-                worksheet.column_dimensions['C'].width = 30  # section
-                worksheet.column_dimensions['D'].width = 30  # subsection
-                worksheet.column_dimensions['E'].width = 30  # subsubsection
-                worksheet.column_dimensions['F'].width = 30  # subsubsubsection
-                worksheet.column_dimensions['G'].width = 40  # full_title
-                worksheet.column_dimensions['H'].width = 12  # start_page
-                worksheet.column_dimensions['I'].width = 12  # end_page
-                worksheet.column_dimensions['J'].width = 80  # content
-                worksheet.column_dimensions['K'].width = 15  # content_length
-
-                # Enable text wrapping for content column
-                from openpyxl.styles import Alignment
-                for row in worksheet.iter_rows(min_row=2, max_row=len(df)+1, min_col=10, max_col=10):
-                    for cell in row:
-                        cell.alignment = Alignment(wrap_text=True, vertical='top')
-            else:
-                # Standard column widths
-                worksheet.column_dimensions['A'].width = 30  # document_name
-                worksheet.column_dimensions['B'].width = 30  # section
-                worksheet.column_dimensions['C'].width = 30  # subsection
-                worksheet.column_dimensions['D'].width = 30  # subsubsection
-                worksheet.column_dimensions['E'].width = 30  # subsubsubsection
-                worksheet.column_dimensions['F'].width = 80  # content
-
-                # Enable text wrapping for content column
-                from openpyxl.styles import Alignment
-                for row in worksheet.iter_rows(min_row=2, max_row=len(df)+1, min_col=6, max_col=6):
-                    for cell in row:
-                        cell.alignment = Alignment(wrap_text=True, vertical='top')
-
-        logger.info(f"Saved {len(df)} entries to {output_path}")
+
+        # Rows are streamed into a write-only workbook, so neither a DataFrame nor the whole
+        # sheet is held in memory next to hierarchy_data
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet('Extracted_Data')
+
+        # Column widths must be set before the first row is written
+        if has_enhanced_format:
+            # Adjust column widths for enhanced format
+            worksheet.column_dimensions['A'].width = 30  # document_name
+            worksheet.column_dimensions['B'].width = 8   # level
+            worksheet.column_dimensions['C'].width = 30  # section
+            worksheet.column_dimensions['D'].width = 30  # subsection
+            worksheet.column_dimensions['E'].width = 30  # subsubsection
+            worksheet.column_dimensions['F'].width = 30  # subsubsubsection
+            worksheet.column_dimensions['G'].width = 40  # full_title
+            worksheet.column_dimensions['H'].width = 12  # start_page
+            worksheet.column_dimensions['I'].width = 12  # end_page
+            worksheet.column_dimensions['J'].width = 80  # content
+            worksheet.column_dimensions['K'].width = 15  # content_length
+        else:
+            # Standard column widths
+            worksheet.column_dimensions['A'].width = 30  # document_name
+            worksheet.column_dimensions['B'].width = 30  # section
+            worksheet.column_dimensions['C'].width = 30  # subsection
+            worksheet.column_dimensions['D'].width = 30  # subsubsection
+            worksheet.column_dimensions['E'].width = 30  # subsubsubsection
+            worksheet.column_dimensions['F'].width = 80  # content
+
+        # Header row, styled the way pandas' to_excel styles it
+        header_font = Font(bold=True)
+        header_border = Border(left=Side(style='thin'), right=Side(style='thin'),
+                               top=Side(style='thin'), bottom=Side(style='thin'))
+        header_alignment = Alignment(horizontal='center', vertical='top')
+        header_row = []
+        for column in columns:
+            cell = WriteOnlyCell(worksheet, value=column)
+            cell.font = header_font
+            cell.border = header_border
+            cell.alignment = header_alignment
+            header_row.append(cell)
+        worksheet.append(header_row)
+
+        # Enable text wrapping for content column; missing fields are written as empty
+        wrap_alignment = Alignment(wrap_text=True, vertical='top')
+        content_index = columns.index('content')
+        for entry in hierarchy_data:
+            row = [entry.get(column, '') for column in columns]
+            content_cell = WriteOnlyCell(worksheet, value=row[content_index])
+            content_cell.alignment = wrap_alignment
+            row[content_index] = content_cell
+            worksheet.append(row)
+
+        workbook.save(output_path)
+
+        logger.info(f"Saved {len(hierarchy_data)} entries to {output_path}")
 
     def extract_document_to_excel(self, file_path: str, output_path: str = None, clean_output: bool = False):
         """
@@ -1062,15 +1163,14 @@ class DocumentExtractor:
         Returns:
             Path to output Excel file
         """
+        # Extract document name from path
+        document_name = Path(file_path).stem
+
         if not output_path:
-            file_name = Path(file_path).stem
-            output_path = f"{file_name}_hierarchy.xlsx"
+            output_path = f"{document_name}_hierarchy.xlsx"
 
         logger.info(f"Starting extraction from: {file_path}")
 
-        # Extract document name from path
-        document_name = Path(file_path).stem
-
         # Extract text from document
         pages_text = self.extract_text(file_path)
 
@@ -6,18 +6,31 @@ This service provides Google Gemini API integration for question generation.
 """
 
 import os
+import re
+import json
 import logging
 import asyncio
+import random
 import time
-from typing import List, Dict, Optional, Tuple
+from typing import Any, List, Dict, Optional, Tuple
+
+# orjson is optional: a faster decoder for the JSON in model responses
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
 
 try:
     import google.generativeai as genai
     from google.generativeai.types import HarmCategory, HarmBlockThreshold
+    from google.api_core import exceptions as google_exceptions
     GEMINI_AVAILABLE = True
 except ImportError:
     GEMINI_AVAILABLE = False
     genai = None
+    google_exceptions = None
 
 from ai_service_base import (
     BaseAIService, AIProviderType, AIServiceStatus, AIServiceConfig, 
@@ -26,6 +39,68 @@ from ai_service_base import (
 
 logger = logging.getLogger(__name__)
 
+# Model used when none is configured
+_DEFAULT_MODEL = "gemini-1.5-flash"
+
+# Block medium-and-above harassment, hate speech, sexual and dangerous content
+_SAFETY_SETTINGS = [
+    {"category": category, "threshold": HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE}
+    for category in (
+        HarmCategory.HARM_CATEGORY_HARASSMENT,
+        HarmCategory.HARM_CATEGORY_HATE_SPEECH,
+        HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT,
+        HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
+    )
+] if GEMINI_AVAILABLE else []
+
+# Request errors that fail the same way on every attempt (bad request or key, missing model)
+_NON_RETRYABLE_ERRORS = (
+    google_exceptions.InvalidArgument,
+    google_exceptions.Unauthenticated,
+    google_exceptions.PermissionDenied,
+    google_exceptions.NotFound,
+) if GEMINI_AVAILABLE else ()
+
+# Retry delays in seconds: the first is drawn from [base, 3 * base], each later one from
+# [base, 3 * previous delay], capped
+_RETRY_BASE_DELAY = 1.0
+_RETRY_MAX_DELAY = 20.0
+
+# Last-resort match for a flat {"question": ..., "answer": ...} object in free-form text
+_QA_JSON_RE = re.compile(r'\{[^{}]*"question"[^{}]*"answer"[^{}]*\}', re.DOTALL)
+
+
+def _loads_json(text: str) -> Any:
+    """Decode JSON with orjson when available (its errors subclass json.JSONDecodeError)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _next_retry_delay(previous_delay: float) -> float:
+    """
+    Pick the next retry delay with decorrelated jitter.
+
+    Concurrent requests that fail together (rate limits, outages) spread their
+    retries out instead of all retrying at the same 1, 2, 4 second marks.
+
+    Args:
+        previous_delay: The delay used before the previous retry (or the base delay)
+
+    Returns:
+        float: Seconds to sleep before the next attempt
+    """
+    return min(_RETRY_MAX_DELAY, random.uniform(_RETRY_BASE_DELAY, previous_delay * 3))
+
+
+def _generation_config(config: AIServiceConfig) -> Dict[str, Any]:
+    """Build the Gemini generation config from a service configuration."""
+    return {
+        "temperature": config.temperature,
+        "top_p": config.top_p,
+        "max_output_tokens": config.max_tokens,
+    }
+
 
 class GoogleGeminiService(BaseAIService):
     """Google Gemini AI service implementation."""
@@ -34,6 +109,8 @@ class GoogleGeminiService(BaseAIService):
         """Initialize Google Gemini service with configuration."""
         super().__init__(config)
         self._model = None
+        # GenerativeModel per model name, so per-call model overrides reuse one client each
+        self._models: Dict[str, Any] = {}
         
         if not GEMINI_AVAILABLE:
             self._last_error = "Google Generative AI library not available. Install with: pip install google-generativeai"
@@ -56,38 +133,14 @@ class GoogleGeminiService(BaseAIService):
             genai.configure(api_key=self.config.api_key)
             
             # Initialize model
-            model_name = self.config.model_name or "gemini-1.5-flash"
-            
-            generation_config = {
-                "temperature": self.config.temperature,
-                "top_p": self.config.top_p,
-                "max_output_tokens": self.config.max_tokens,
-            }
-            
-            safety_settings = [
-                {
-                    "category": HarmCategory.HARM_CATEGORY_HARASSMENT,
-                    "threshold": HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE
-                },
-                {
-                    "category": HarmCategory.HARM_CATEGORY_HATE_SPEECH,
-                    "threshold": HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE
-                },
-                {
-                    "category": HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT,
-                    "threshold": HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE
-                },
-                {
-                    "category": HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
-                    "threshold": HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE
-                },
-            ]
+            model_name = self.config.model_name or _DEFAULT_MODEL
             
             self._model = genai.GenerativeModel(
                 model_name=model_name,
-                generation_config=generation_config,
-                safety_settings=safety_settings
+                generation_config=_generation_config(self.config),
+                safety_settings=_SAFETY_SETTINGS
             )
+            self._models = {model_name: self._model}
             
             # Test connection
             test_response = await self.test_connection()
@@ -106,6 +159,27 @@ class GoogleGeminiService(BaseAIService):
             logger.error(f"Failed to initialize Google Gemini service: {e}")
             return False
     
+    def _get_model(self, model_name: Optional[str]):
+        """
+        Get the GenerativeModel for a model name, creating and caching it on first use.
+
+        Args:
+            model_name: Model to run, or None for the configured model
+
+        Returns:
+            The cached genai.GenerativeModel for that name
+        """
+        model_name = model_name or self.config.model_name or _DEFAULT_MODEL
+        model = self._models.get(model_name)
+        if model is None:
+            model = genai.GenerativeModel(
+                model_name=model_name,
+                generation_config=_generation_config(self.config),
+                safety_settings=_SAFETY_SETTINGS
+            )
+            self._models[model_name] = model
+        return model
+
     async def test_connection(self) -> AIResponse:
         """Test connection to Google Gemini service."""
         if not self._model:
@@ -116,18 +190,18 @@ class GoogleGeminiService(BaseAIService):
             )
         
         try:
-            start_time = time.time()
+            start_time = time.perf_counter()
             
             # Make a simple test call
-            response = self._model.generate_content("Say 'test' if you can hear me.")
-            response_time = time.time() - start_time
+            response = await self._model.generate_content_async("Say 'test' if you can hear me.")
+            response_time = time.perf_counter() - start_time
             
             if response.text:
                 return AIResponse(
                     success=True,
                     content=response.text.strip(),
                     provider=self.provider_type,
-                    model_used=self.config.model_name or "gemini-1.5-flash",
+                    model_used=self.config.model_name or _DEFAULT_MODEL,
                     response_time=response_time,
                     metadata={"usage": getattr(response, 'usage_metadata', None)}
                 )
@@ -148,7 +222,8 @@ class GoogleGeminiService(BaseAIService):
     
     async def generate_question_answer_pair(self, content: str, context: Optional[Dict[str, str]] = None,
                                            system_prompt: Optional[str] = None,
-                                           generation_mode: str = 'qa_pair') -> AIResponse:
+                                           generation_mode: str = 'qa_pair',
+                                           config: Optional[AIServiceConfig] = None) -> AIResponse:
         """
         Generate a question-answer pair for the given content with JSON output.
 
@@ -157,10 +232,13 @@ class GoogleGeminiService(BaseAIService):
             context: Optional hierarchical context
             system_prompt: Custom system prompt (required)
             generation_mode: Mode for generation ('qa_pair' or 'question_only')
+            config: Optional per-call configuration overriding the service config
 
         Returns:
             AIResponse: Generated question-answer pair as JSON or error
         """
+        config = config or self.config
+
         if not self._model:
             return AIResponse(
                 success=False,
@@ -178,23 +256,31 @@ class GoogleGeminiService(BaseAIService):
             )
 
         try:
-            # Use the configured model
-            model_name = self.config.model_name or "gemini-1.5-flash"
+            # Run the per-call model and sampling parameters, not the ones the service
+            # was initialized with
+            model_name = config.model_name or self.config.model_name or _DEFAULT_MODEL
+            model = self._get_model(model_name)
+            generation_config = _generation_config(config)
 
             # Create prompt using the provided system_prompt parameter
             prompt = self._create_prompt(content, context, system_prompt, generation_mode)
-            start_time = time.time()
 
             # Make API call with retries
-            for attempt in range(self.config.max_retries):
+            retry_delay = _RETRY_BASE_DELAY
+            for attempt in range(config.max_retries):
                 try:
-                    response = self._model.generate_content(prompt)
-                    response_time = time.time() - start_time
+                    # Time only the attempt that answers, not earlier failures and backoff
+                    attempt_start = time.perf_counter()
+                    response = await model.generate_content_async(
+                        prompt, generation_config=generation_config
+                    )
+                    response_time = time.perf_counter() - attempt_start
 
                     if not response.text:
-                        if attempt < self.config.max_retries - 1:
+                        if attempt < config.max_retries - 1:
                             logger.warning(f"No response text received, retrying (attempt {attempt + 1})")
-                            await asyncio.sleep(2 ** attempt)
+                            retry_delay = _next_retry_delay(retry_delay)
+                            await asyncio.sleep(retry_delay)
                             continue
                         else:
                             return AIResponse(
@@ -210,18 +296,22 @@ class GoogleGeminiService(BaseAIService):
                     if generation_mode == 'qa_pair':
                         # Try to parse JSON response
                         try:
-                            import json
                             # Try direct JSON parsing
                             if response_content.startswith('{'):
-                                qa_data = json.loads(response_content)
+                                qa_data = _loads_json(response_content)
                             else:
-                                # Extract JSON from markdown or other formatting
-                                import re
-                                json_match = re.search(r'\{[^{}]*"question"[^{}]*"answer"[^{}]*\}', response_content, re.DOTALL)
-                                if json_match:
-                                    qa_data = json.loads(json_match.group(0))
-                                else:
-                                    raise ValueError("No valid JSON found in response")
+                                # Extract JSON from markdown or other formatting: a single
+                                # brace-matching pass first, the regex only if that fails
+                                json_str = self._extract_json_from_text(response_content)
+                                try:
+                                    qa_data = _loads_json(json_str) if json_str else None
+                                except json.JSONDecodeError:
+                                    qa_data = None
+                                if not (isinstance(qa_data, dict) and 'question' in qa_data and 'answer' in qa_data):
+                                    json_match = _QA_JSON_RE.search(response_content)
+                                    if not json_match:
+                                        raise ValueError("No valid JSON found in response")
+                                    qa_data = _loads_json(json_match.group(0))
 
                             # Validate JSON has required fields
                             if 'question' not in qa_data or 'answer' not in qa_data:
@@ -237,9 +327,10 @@ class GoogleGeminiService(BaseAIService):
                                 metadata={"usage": getattr(response, 'usage_metadata', None)}
                             )
                         except (json.JSONDecodeError, ValueError) as e:
-                            if attempt < self.config.max_retries - 1:
+                            if attempt < config.max_retries - 1:
                                 logger.warning(f"Failed to parse JSON response, retrying (attempt {attempt + 1}): {e}")
-                                await asyncio.sleep(2 ** attempt)
+                                retry_delay = _next_retry_delay(retry_delay)
+                                await asyncio.sleep(retry_delay)
                                 continue
                             else:
                                 return AIResponse(
@@ -258,10 +349,14 @@ class GoogleGeminiService(BaseAIService):
                             metadata={"usage": getattr(response, 'usage_metadata', None)}
                         )
 
+                except _NON_RETRYABLE_ERRORS:
+                    # Retrying can't fix a rejected request, key or model name
+                    raise
                 except Exception as e:
-                    if attempt < self.config.max_retries - 1:
+                    if attempt < config.max_retries - 1:
                         logger.warning(f"API call failed, retrying (attempt {attempt + 1}): {e}")
-                        await asyncio.sleep(2 ** attempt)
+                        retry_delay = _next_retry_delay(retry_delay)
+                        await asyncio.sleep(retry_delay)
                     else:
                         raise e
 
@@ -273,7 +368,8 @@ class GoogleGeminiService(BaseAIService):
                 provider=self.provider_type
             )
 
-    async def generate_question(self, content: str, context: Optional[Dict[str, str]] = None) -> AIResponse:
+    async def generate_question(self, content: str, context: Optional[Dict[str, str]] = None,
+                                config: Optional[AIServiceConfig] = None) -> AIResponse:
         """
         Generate a training question for the given content.
         This is a backward-compatible method that uses generate_question_answer_pair.
@@ -286,9 +382,10 @@ class GoogleGeminiService(BaseAIService):
         system_prompt = get_current_system_prompt()
 
         # Use the new implementation
-        return await self.generate_question_answer_pair(content, context, system_prompt, 'qa_pair')
+        return await self.generate_question_answer_pair(content, context, system_prompt, 'qa_pair', config)
     
-    async def generate_text_direct(self, prompt: str, system_instruction: Optional[str] = None) -> AIResponse:
+    async def generate_text_direct(self, prompt: str, system_instruction: Optional[str] = None,
+                                   model_name: Optional[str] = None) -> AIResponse:
         """
         Generate text directly without system prompt requirements.
         This is useful for meta-tasks like generating system prompts.
@@ -296,6 +393,7 @@ class GoogleGeminiService(BaseAIService):
         Args:
             prompt: The user prompt
             system_instruction: Optional system instruction for the AI
+            model_name: Optional model override for this call only
 
         Returns:
             AIResponse: Generated text or error
@@ -308,7 +406,7 @@ class GoogleGeminiService(BaseAIService):
             )
 
         try:
-            start_time = time.time()
+            start_time = time.perf_counter()
 
             # Create a simple prompt with optional system instruction
             full_prompt = prompt
@@ -316,8 +414,9 @@ class GoogleGeminiService(BaseAIService):
                 full_prompt = f"{system_instruction}\n\n{prompt}"
 
             # Make API call
-            response = self._model.generate_content(full_prompt)
-            response_time = time.time() - start_time
+            model_name = model_name or self.config.model_name or _DEFAULT_MODEL
+            response = await self._get_model(model_name).generate_content_async(full_prompt)
+            response_time = time.perf_counter() - start_time
 
             if not response.text:
                 return AIResponse(
@@ -330,7 +429,7 @@ class GoogleGeminiService(BaseAIService):
                 success=True,
                 content=response.text.strip(),
                 provider=self.provider_type,
-                model_used=self.config.model_name or "gemini-1.5-flash",
+                model_used=model_name,
                 response_time=response_time,
                 metadata={"usage": getattr(response, 'usage_metadata', None)}
             )
@@ -372,7 +471,7 @@ def create_gemini_config_from_env() -> AIServiceConfig:
     return AIServiceConfig(
         provider_type=AIProviderType.GOOGLE_GEMINI,
         api_key=os.getenv('GOOGLE_GEMINI_API_KEY'),
-        model_name=os.getenv('GOOGLE_GEMINI_MODEL', 'gemini-1.5-flash'),
+        model_name=os.getenv('GOOGLE_GEMINI_MODEL', _DEFAULT_MODEL),
         max_retries=int(os.getenv('GOOGLE_GEMINI_MAX_RETRIES', '3')),
         timeout=int(os.getenv('GOOGLE_GEMINI_TIMEOUT', '30')),
         temperature=float(os.getenv('GOOGLE_GEMINI_TEMPERATURE', '0.7')),
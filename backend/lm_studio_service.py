@@ -266,7 +266,8 @@ class LMStudioService(BaseAIService):
     
     async def generate_question_answer_pair(self, content: str, context: Optional[Dict[str, str]] = None,
                                            system_prompt: Optional[str] = None,
-                                           generation_mode: str = 'qa_pair') -> AIResponse:
+                                           generation_mode: str = 'qa_pair',
+                                           config: Optional[AIServiceConfig] = None) -> AIResponse:
         """
         Generate a question-answer pair for the given content with JSON output.
 
@@ -275,10 +276,13 @@ class LMStudioService(BaseAIService):
             context: Optional hierarchical context
             system_prompt: Custom system prompt (required)
             generation_mode: Mode for generation ('qa_pair' or 'question_only')
+            config: Optional per-call configuration overriding the service config
 
         Returns:
             AIResponse: Generated question-answer pair as JSON or error
         """
+        config = config or self.config
+
         # Ensure session is valid for current event loop
         await self._ensure_session()
 
@@ -300,7 +304,7 @@ class LMStudioService(BaseAIService):
 
         try:
             # Use the configured model or the first available model
-            model_name = self.config.model_name
+            model_name = config.model_name
             if not model_name and self._available_models:
                 model_name = self._available_models[0].name
             elif not model_name:
@@ -311,7 +315,7 @@ class LMStudioService(BaseAIService):
             start_time = time.time()
 
             # Make API call with retries
-            for attempt in range(self.config.max_retries):
+            for attempt in range(config.max_retries):
                 try:
                     # LM Studio supports OpenAI-compatible chat API with separate system message
                     # We pass an empty system message and include everything in the user prompt
@@ -324,9 +328,9 @@ class LMStudioService(BaseAIService):
                                 "content": prompt
                             }
                         ],
-                        "max_tokens": self.config.max_tokens,
-                        "temperature": self.config.temperature,
-                        "top_p": self.config.top_p
+                        "max_tokens": config.max_tokens,
+                        "temperature": config.temperature,
+                        "top_p": config.top_p
                     }
                     
                     async with self._session.post(f"{self._base_url}/chat/completions", json=payload) as response:
@@ -337,7 +341,7 @@ class LMStudioService(BaseAIService):
                             response_content = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
 
                             if not response_content:
-                                if attempt < self.config.max_retries - 1:
+                                if attempt < config.max_retries - 1:
                                     logger.warning(f"No response content received, retrying (attempt {attempt + 1})")
                                     await asyncio.sleep(2 ** attempt)
                                     continue
@@ -380,7 +384,7 @@ class LMStudioService(BaseAIService):
                                         response_time=response_time
                                     )
                                 except (json.JSONDecodeError, ValueError) as e:
-                                    if attempt < self.config.max_retries - 1:
+                                    if attempt < config.max_retries - 1:
                                         logger.warning(f"Failed to parse JSON response, retrying (attempt {attempt + 1}): {e}")
                                         await asyncio.sleep(2 ** attempt)
                                         continue
@@ -402,7 +406,7 @@ class LMStudioService(BaseAIService):
                                 )
                         else:
                             error_text = await response.text()
-                            if attempt < self.config.max_retries - 1:
+                            if attempt < config.max_retries - 1:
                                 logger.warning(f"API call failed, retrying (attempt {attempt + 1}): HTTP {response.status}")
                                 await asyncio.sleep(2 ** attempt)
                             else:
@@ -413,7 +417,7 @@ class LMStudioService(BaseAIService):
                                 )
                     
                 except Exception as e:
-                    if attempt < self.config.max_retries - 1:
+                    if attempt < config.max_retries - 1:
                         logger.warning(f"API call failed, retrying (attempt {attempt + 1}): {e}")
                         await asyncio.sleep(2 ** attempt)
                     else:
@@ -427,7 +431,8 @@ class LMStudioService(BaseAIService):
                 provider=self.provider_type
             )
 
-    async def generate_question(self, content: str, context: Optional[Dict[str, str]] = None) -> AIResponse:
+    async def generate_question(self, content: str, context: Optional[Dict[str, str]] = None,
+                                config: Optional[AIServiceConfig] = None) -> AIResponse:
         """
         Generate a training question for the given content.
         This is a backward-compatible method that uses generate_question_answer_pair.
@@ -440,9 +445,10 @@ class LMStudioService(BaseAIService):
         system_prompt = get_current_system_prompt()
 
         # Use the new implementation
-        return await self.generate_question_answer_pair(content, context, system_prompt, 'qa_pair')
+        return await self.generate_question_answer_pair(content, context, system_prompt, 'qa_pair', config)
 
-    async def generate_text_direct(self, prompt: str, system_instruction: Optional[str] = None) -> AIResponse:
+    async def generate_text_direct(self, prompt: str, system_instruction: Optional[str] = None,
+                                   model_name: Optional[str] = None) -> AIResponse:
         """
         Generate text directly without system prompt requirements.
         This is useful for meta-tasks like generating system prompts.
@@ -450,6 +456,7 @@ class LMStudioService(BaseAIService):
         Args:
             prompt: The user prompt
             system_instruction: Optional system instruction for the AI
+            model_name: Optional model override for this call only
 
         Returns:
             AIResponse: Generated text or error
@@ -467,8 +474,8 @@ class LMStudioService(BaseAIService):
         try:
             start_time = time.time()
 
-            # Use the configured model or the first available model
-            model_name = self.config.model_name
+            # Use the requested model, the configured model or the first available model
+            model_name = model_name or self.config.model_name
             if not model_name and self._available_models:
                 model_name = self._available_models[0].name
             elif not model_name:
@@ -247,7 +247,8 @@ class OllamaService(BaseAIService):
     
     async def generate_question_answer_pair(self, content: str, context: Optional[Dict[str, str]] = None,
                                            system_prompt: Optional[str] = None,
-                                           generation_mode: str = 'qa_pair') -> AIResponse:
+                                           generation_mode: str = 'qa_pair',
+                                           config: Optional[AIServiceConfig] = None) -> AIResponse:
         """
         Generate a question-answer pair for the given content with JSON output.
 
@@ -256,10 +257,13 @@ class OllamaService(BaseAIService):
             context: Optional hierarchical context
             system_prompt: Custom system prompt (required)
             generation_mode: Mode for generation ('qa_pair' or 'question_only')
+            config: Optional per-call configuration overriding the service config
 
         Returns:
             AIResponse: Generated question-answer pair as JSON or error
         """
+        config = config or self.config
+
         content_length = len(content.strip()) if content else 0
         if not content or content_length < 10:
             logger.warning(f"Content too short for Ollama question generation: {content_length} characters (minimum 10 required)")
@@ -273,7 +277,7 @@ class OllamaService(BaseAIService):
         session = None
         try:
             # Use the configured model or the first available model
-            model_name = self.config.model_name
+            model_name = config.model_name
             if not model_name and self._available_models:
                 model_name = self._available_models[0].name
             elif not model_name:
@@ -299,23 +303,23 @@ class OllamaService(BaseAIService):
             )
             session = aiohttp.ClientSession(
                 connector=connector,
-                timeout=aiohttp.ClientTimeout(total=self.config.timeout),
+                timeout=aiohttp.ClientTimeout(total=config.timeout),
                 headers={"Content-Type": "application/json"}
             )
 
             start_time = time.time()
 
             # Make API call with retries
-            for attempt in range(self.config.max_retries):
+            for attempt in range(config.max_retries):
                 try:
                     payload = {
                         "model": model_name,
                         "prompt": full_prompt,
                         "stream": False,
                         "options": {
-                            "temperature": self.config.temperature,
-                            "top_p": self.config.top_p,
-                            "num_predict": self.config.max_tokens
+                            "temperature": config.temperature,
+                            "top_p": config.top_p,
+                            "num_predict": config.max_tokens
                         }
                     }
 
@@ -327,7 +331,7 @@ class OllamaService(BaseAIService):
                             response_content = data.get("response", "").strip()
 
                             if not response_content:
-                                if attempt < self.config.max_retries - 1:
+                                if attempt < config.max_retries - 1:
                                     logger.warning(f"No response content received, retrying (attempt {attempt + 1})")
                                     await asyncio.sleep(2 ** attempt)
                                     continue
@@ -374,7 +378,7 @@ class OllamaService(BaseAIService):
                                         }
                                     )
                                 except (json.JSONDecodeError, ValueError) as e:
-                                    if attempt < self.config.max_retries - 1:
+                                    if attempt < config.max_retries - 1:
                                         logger.warning(f"Failed to parse JSON response, retrying (attempt {attempt + 1}): {e}")
                                         await asyncio.sleep(2 ** attempt)
                                         continue
@@ -401,7 +405,7 @@ class OllamaService(BaseAIService):
                                 )
                         else:
                             error_text = await response.text()
-                            if attempt < self.config.max_retries - 1:
+                            if attempt < config.max_retries - 1:
                                 logger.warning(f"API call failed, retrying (attempt {attempt + 1}): HTTP {response.status}")
                                 await asyncio.sleep(2 ** attempt)
                             else:
@@ -412,7 +416,7 @@ class OllamaService(BaseAIService):
                                 )
                     
                 except Exception as e:
-                    if attempt < self.config.max_retries - 1:
+                    if attempt < config.max_retries - 1:
                         logger.warning(f"API call failed, retrying (attempt {attempt + 1}): {e}")
                         await asyncio.sleep(2 ** attempt)
                     else:
@@ -430,7 +434,8 @@ class OllamaService(BaseAIService):
             if session:
                 await session.close()
 
-    async def generate_question(self, content: str, context: Optional[Dict[str, str]] = None) -> AIResponse:
+    async def generate_question(self, content: str, context: Optional[Dict[str, str]] = None,
+                                config: Optional[AIServiceConfig] = None) -> AIResponse:
         """
         Generate a training question for the given content.
         This is a backward-compatible method that uses generate_question_answer_pair.
@@ -443,9 +448,10 @@ class OllamaService(BaseAIService):
         system_prompt = get_current_system_prompt()
 
         # Use the new implementation
-        return await self.generate_question_answer_pair(content, context, system_prompt, 'qa_pair')
+        return await self.generate_question_answer_pair(content, context, system_prompt, 'qa_pair', config)
 
-    async def generate_text_direct(self, prompt: str, system_instruction: Optional[str] = None) -> AIResponse:
+    async def generate_text_direct(self, prompt: str, system_instruction: Optional[str] = None,
+                                   model_name: Optional[str] = None) -> AIResponse:
         """
         Generate text directly without system prompt requirements.
         This is useful for meta-tasks like generating system prompts.
@@ -453,6 +459,7 @@ class OllamaService(BaseAIService):
         Args:
             prompt: The user prompt
             system_instruction: Optional system instruction for the AI
+            model_name: Optional model override for this call only
 
         Returns:
             AIResponse: Generated text or error
@@ -468,11 +475,12 @@ class OllamaService(BaseAIService):
             )
 
         try:
+            model_name = model_name or self.config.model_name or "llama2"
             start_time = time.time()
 
             # Prepare the request payload
             payload = {
-                "model": self.config.model_name or "llama2",
+                "model": model_name,
                 "prompt": prompt,
                 "stream": False,
                 "options": {
@@ -515,7 +523,7 @@ class OllamaService(BaseAIService):
                     success=True,
                     content=generated_text,
                     provider=self.provider_type,
-                    model_used=self.config.model_name or "llama2",
+                    model_used=model_name,
                     response_time=response_time,
                     metadata=result
                 )
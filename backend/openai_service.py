@@ -145,7 +145,8 @@ class OpenAIService(BaseAIService):
     
     async def generate_question_answer_pair(self, content: str, context: Optional[Dict[str, str]] = None,
                                            system_prompt: Optional[str] = None,
-                                           generation_mode: str = 'qa_pair') -> AIResponse:
+                                           generation_mode: str = 'qa_pair',
+                                           config: Optional[AIServiceConfig] = None) -> AIResponse:
         """
         Generate a question-answer pair for the given content with JSON output.
 
@@ -154,10 +155,13 @@ class OpenAIService(BaseAIService):
             context: Optional hierarchical context
             system_prompt: Custom system prompt (required)
             generation_mode: Mode for generation ('qa_pair' or 'question_only')
+            config: Optional per-call configuration overriding the service config
 
         Returns:
             AIResponse: Generated question-answer pair as JSON or error
         """
+        config = config or self.config
+
         if not self._client:
             return AIResponse(
                 success=False,
@@ -176,14 +180,14 @@ class OpenAIService(BaseAIService):
 
         try:
             # Use the configured model
-            model_name = self.config.model_name or "gpt-4o"
+            model_name = config.model_name or "gpt-4o"
 
             # Create prompt using the provided system_prompt parameter
             prompt = self._create_prompt(content, context, system_prompt, generation_mode)
             start_time = time.time()
 
             # Make API call with retries
-            for attempt in range(self.config.max_retries):
+            for attempt in range(config.max_retries):
                 try:
                     # OpenAI supports separate system and user messages
                     # However, _create_prompt already includes the system prompt, so we use it as user content
@@ -195,19 +199,19 @@ class OpenAIService(BaseAIService):
                     ]
 
                     # Get the appropriate token parameter for this model
-                    token_param = self._get_token_param(self.config.max_tokens)
+                    token_param = self._get_token_param(config.max_tokens)
 
                     response = await self._client.chat.completions.create(
                         model=model_name,
                         messages=messages,
-                        temperature=self.config.temperature,
-                        top_p=self.config.top_p,
+                        temperature=config.temperature,
+                        top_p=config.top_p,
                         **token_param
                     )
                     response_time = time.time() - start_time
 
                     if not response.choices or not response.choices[0].message.content:
-                        if attempt < self.config.max_retries - 1:
+                        if attempt < config.max_retries - 1:
                             logger.warning(f"No response content received, retrying (attempt {attempt + 1})")
                             await asyncio.sleep(2 ** attempt)
                             continue
@@ -252,7 +256,7 @@ class OpenAIService(BaseAIService):
                                 metadata={"usage": response.usage.model_dump() if response.usage else None}
                             )
                         except (json.JSONDecodeError, ValueError) as e:
-                            if attempt < self.config.max_retries - 1:
+                            if attempt < config.max_retries - 1:
                                 logger.warning(f"Failed to parse JSON response, retrying (attempt {attempt + 1}): {e}")
                                 await asyncio.sleep(2 ** attempt)
                                 continue
@@ -274,7 +278,7 @@ class OpenAIService(BaseAIService):
                         )
 
                 except Exception as e:
-                    if attempt < self.config.max_retries - 1:
+                    if attempt < config.max_retries - 1:
                         logger.warning(f"API call failed, retrying (attempt {attempt + 1}): {e}")
                         await asyncio.sleep(2 ** attempt)
                     else:
@@ -288,7 +292,8 @@ class OpenAIService(BaseAIService):
                 provider=self.provider_type
             )
 
-    async def generate_question(self, content: str, context: Optional[Dict[str, str]] = None) -> AIResponse:
+    async def generate_question(self, content: str, context: Optional[Dict[str, str]] = None,
+                                config: Optional[AIServiceConfig] = None) -> AIResponse:
         """
         Generate a training question for the given content.
         This is a backward-compatible method that uses generate_question_answer_pair.
@@ -300,10 +305,11 @@ class OpenAIService(BaseAIService):
         system_prompt = get_current_system_prompt()
 
         # Use the new implementation
-        return await self.generate_question_answer_pair(content, context, system_prompt, 'qa_pair')
+        return await self.generate_question_answer_pair(content, context, system_prompt, 'qa_pair', config)
     
-    async def generate_text(self, prompt: str, system_instruction: Optional[str] = None) -> AIResponse:
-        """Generate text using OpenAI."""
+    async def generate_text(self, prompt: str, system_instruction: Optional[str] = None,
+                            model_name: Optional[str] = None) -> AIResponse:
+        """Generate text using OpenAI, optionally overriding the configured model for this call."""
         if not self._client:
             return AIResponse(
                 success=False,
@@ -312,6 +318,7 @@ class OpenAIService(BaseAIService):
             )
 
         try:
+            model_name = model_name or self.config.model_name or "gpt-4o"
             start_time = time.time()
 
             messages = []
@@ -323,7 +330,7 @@ class OpenAIService(BaseAIService):
             token_param = self._get_token_param(self.config.max_tokens)
 
             response = await self._client.chat.completions.create(
-                model=self.config.model_name or "gpt-4o",
+                model=model_name,
                 messages=messages,
                 temperature=self.config.temperature,
                 top_p=self.config.top_p,
@@ -342,7 +349,7 @@ class OpenAIService(BaseAIService):
                 success=True,
                 content=response.choices[0].message.content.strip(),
                 provider=self.provider_type,
-                model_used=self.config.model_name or "gpt-4o",
+                model_used=model_name,
                 response_time=response_time,
                 metadata={"usage": response.usage.model_dump() if response.usage else None}
             )
@@ -355,12 +362,13 @@ class OpenAIService(BaseAIService):
                 provider=self.provider_type
             )
 
-    async def generate_text_direct(self, prompt: str, system_instruction: Optional[str] = None) -> AIResponse:
+    async def generate_text_direct(self, prompt: str, system_instruction: Optional[str] = None,
+                                   model_name: Optional[str] = None) -> AIResponse:
         """
         Alias for generate_text - for compatibility with other services.
         Generate text directly without system prompt requirements.
         """
-        return await self.generate_text(prompt, system_instruction)
+        return await self.generate_text(prompt, system_instruction, model_name)
     
     async def get_available_models(self) -> List[ModelInfo]:
         """Get list of available OpenAI models."""
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Question-Answer Cache
+
+This module provides a persistent cache of generated question-answer pairs so that
+re-running generation over the same content with the same prompt, model and sampling
+parameters returns the stored pair instead of calling the AI provider again.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import tempfile
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Any
+
+logger = logging.getLogger(__name__)
+
+
+class QACache:
+    """SQLite-backed exact-match cache of generated question-answer pairs."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            db_path: Path of the SQLite database file. Defaults to qg_cache.db in the system temp
+                directory, since the source directory may be read-only in packaged deployments.
+        """
+        self.db_path = Path(db_path) if db_path else Path(tempfile.gettempdir()) / 'qg_cache.db'
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS qg_cache ("
+            "key TEXT PRIMARY KEY, question TEXT, answer TEXT, provider TEXT, ts INTEGER)"
+        )
+        self._connection.commit()
+
+    @staticmethod
+    def make_key(content: str, context: Optional[Dict[str, str]], params: Dict[str, Any]) -> str:
+        """
+        Build the cache key for a generation request.
+
+        Args:
+            content: Content the question-answer pair is generated from
+            context: Hierarchical context sent along with the content
+            params: Everything else that shapes the output (provider, model, mode, prompt, sampling)
+
+        Returns:
+            str: SHA-256 hex digest identifying the request
+        """
+        payload = json.dumps([params, context, content], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, str]]:
+        """Return the cached (question, answer) for a key, or None on a miss."""
+        try:
+            with self._lock:
+                row = self._connection.execute(
+                    "SELECT question, answer FROM qg_cache WHERE key = ?", (key,)
+                ).fetchone()
+            return (row[0], row[1]) if row else None
+        except sqlite3.Error as e:
+            logger.warning(f"Q&A cache lookup failed: {e}")
+            return None
+
+    def put(self, key: str, question: str, answer: str, provider: Optional[str]):
+        """Store a generated (question, answer) pair."""
+        try:
+            with self._lock:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO qg_cache (key, question, answer, provider, ts) VALUES (?, ?, ?, ?, ?)",
+                    (key, question, answer, provider, int(time.time()))
+                )
+                self._connection.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Q&A cache write failed: {e}")
+
+
+# Global cache instance
+_qa_cache: Optional[QACache] = None
+_qa_cache_lock = threading.Lock()
+
+
+def get_qa_cache() -> Optional[QACache]:
+    """
+    Get the global Q&A cache instance.
+
+    Returns:
+        QACache or None if caching is disabled via QG_CACHE_ENABLED=false or the database cannot be opened
+    """
+    global _qa_cache
+    if os.getenv('QG_CACHE_ENABLED', 'true').lower() == 'false':
+        return None
+
+    with _qa_cache_lock:
+        if _qa_cache is None:
+            try:
+                _qa_cache = QACache(os.getenv('QG_CACHE_PATH'))
+            except (sqlite3.Error, OSError) as e:
+                logger.error(f"Failed to open Q&A cache: {e}")
+                return None
+        return _qa_cache
@@ -205,14 +205,13 @@ def sync_request_credentials_to_manager(request: Request):
             # Remove None values
             cred_dict = {k: v for k, v in cred_dict.items() if v is not None}
 
-            # Update in-memory credentials (this modifies _credentials dict but doesn't call _save_credentials)
-            from dataclasses import asdict
+            # Update in-memory credentials only (does not call _save_credentials)
             from credential_manager import ProviderCredentials as CMProviderCredentials
 
-            credential_manager._credentials[provider_id] = CMProviderCredentials(
+            credential_manager.set_in_memory_credentials(provider_id, CMProviderCredentials(
                 provider_id=provider_id,
                 **cred_dict
-            )
+            ))
 
             logger.debug(f"✅ Synced request credentials to memory for provider: {provider_id}")
 
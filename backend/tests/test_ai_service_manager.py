@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for the provider payload caches in AIServiceManager.
+
+Run from the backend directory with: python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_service_base import AIProviderType, AIServiceConfig, AIServiceStatus, ModelInfo
+from ai_service_manager import AIServiceManager
+
+
+class _SlowModelsService:
+    """Stand-in service whose model listing blocks until released."""
+
+    def __init__(self, config):
+        self.config = config
+        self.last_error = None
+        self.listing_started = asyncio.Event()
+        self.release_listing = asyncio.Event()
+
+    async def initialize(self):
+        return True
+
+    async def get_available_models(self):
+        self.listing_started.set()
+        await self.release_listing.wait()
+        return [ModelInfo(name='model-a', display_name='Model A')]
+
+    async def cleanup(self):
+        pass
+
+
+class CachedPayloadVersioningTest(unittest.TestCase):
+    """A read interleaved with a status change must not pin the old payload."""
+
+    def _run_interleaved(self, reader):
+        manager = AIServiceManager()
+        config = AIServiceConfig(provider_type=AIProviderType.OLLAMA)
+        service = _SlowModelsService(config)
+        manager._create_service = lambda provider_type, provider_config: service
+
+        async def scenario():
+            init_task = asyncio.create_task(
+                manager.ensure_provider_initialized(AIProviderType.OLLAMA, config)
+            )
+            # Read while the status write is waiting on the model listing
+            await service.listing_started.wait()
+            during = reader(manager)
+            service.release_listing.set()
+            self.assertTrue(await init_task)
+            return during, reader(manager)
+
+        return asyncio.run(scenario())
+
+    def test_models_payload_rebuilt_after_interleaved_read(self):
+        during, after = self._run_interleaved(AIServiceManager.get_cached_models_payload)
+
+        self.assertEqual(during, {})
+        self.assertEqual([model['name'] for model in after['ollama']], ['model-a'])
+
+    def test_provider_payload_rebuilt_after_interleaved_read(self):
+        during, after = self._run_interleaved(AIServiceManager.get_cached_provider_payload)
+
+        self.assertEqual(during, {})
+        self.assertTrue(after['ollama']['available'])
+        self.assertEqual(after['ollama']['status'], AIServiceStatus.AVAILABLE.value)
+        self.assertEqual(after['ollama']['models'], ['model-a'])
+
+    def test_cleanup_invalidates_cached_payloads(self):
+        manager = AIServiceManager()
+        config = AIServiceConfig(provider_type=AIProviderType.OLLAMA)
+        service = _SlowModelsService(config)
+        service.release_listing.set()
+        manager._create_service = lambda provider_type, provider_config: service
+
+        asyncio.run(manager.ensure_provider_initialized(AIProviderType.OLLAMA, config))
+        self.assertIn('ollama', manager.get_cached_models_payload())
+
+        asyncio.run(manager.cleanup())
+        self.assertEqual(manager.get_cached_models_payload(), {})
+        self.assertEqual(manager.get_cached_provider_payload(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
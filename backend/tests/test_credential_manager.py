@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for CredentialManager storage.
+
+Run from the backend directory with: python -m unittest discover tests
+"""
+
+import base64
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import cryptography  # noqa: F401
+    CRYPTOGRAPHY_AVAILABLE = True
+except ImportError:
+    CRYPTOGRAPHY_AVAILABLE = False
+
+from credential_manager import FERNET_TOKEN_PREFIX, CredentialManager, ProviderCredentials
+
+
+@unittest.skipUnless(CRYPTOGRAPHY_AVAILABLE, "cryptography is not installed")
+class InMemoryCredentialsTest(unittest.TestCase):
+    """Credentials synced for this process only must never reach the credentials file."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.manager = CredentialManager(self._tmp.name)
+
+    def _stored_provider_ids(self):
+        with open(self.manager.config_file) as f:
+            return set(json.load(f))
+
+    def test_in_memory_credentials_not_saved_with_other_providers(self):
+        self.manager.set_in_memory_credentials(
+            'openai', ProviderCredentials(provider_id='openai', api_key='sk-header-secret')
+        )
+        self.assertTrue(self.manager.save_credentials('ollama', {'endpoint': 'http://localhost:11434'}))
+
+        self.assertEqual(self._stored_provider_ids(), {'ollama'})
+        with open(self.manager.config_file) as f:
+            self.assertNotIn('sk-header-secret', f.read())
+        self.assertEqual(self.manager.get_credentials('openai').api_key, 'sk-header-secret')
+        self.assertEqual(set(self.manager.list_configured_providers()), {'ollama', 'openai'})
+
+    def test_in_memory_credentials_override_stored_ones(self):
+        self.manager.save_credentials('openai', {'api_key': 'sk-stored'})
+        self.manager.set_in_memory_credentials(
+            'openai', ProviderCredentials(provider_id='openai', api_key='sk-header')
+        )
+        self.assertEqual(self.manager.get_credentials('openai').api_key, 'sk-header')
+
+        self.manager.delete_credentials('openai')
+        self.assertIsNone(self.manager.get_credentials('openai'))
+
+
+@unittest.skipUnless(CRYPTOGRAPHY_AVAILABLE, "cryptography is not installed")
+class LegacyTokenTest(unittest.TestCase):
+    """Values written with the old double base64 encoding still decrypt and get migrated."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.config_dir = self._tmp.name
+
+        # Write a file as an older version would have, next to a value in the current format
+        writer = CredentialManager(self.config_dir)
+        token = writer._cipher.encrypt(b'sk-legacy')
+        self.legacy_token = base64.b64encode(token).decode()
+        self.current_token = writer._cipher.encrypt(b'sk-current').decode('ascii')
+        with open(writer.config_file, 'w') as f:
+            json.dump({
+                'openai': {'provider_id': 'openai', 'api_key': self.legacy_token},
+                'google_gemini': {'provider_id': 'google_gemini', 'api_key': self.current_token},
+            }, f)
+
+    def _stored(self, manager):
+        with open(manager.config_file) as f:
+            return json.load(f)
+
+    def test_legacy_and_current_tokens_decrypt(self):
+        manager = CredentialManager(self.config_dir)
+
+        self.assertTrue(CredentialManager._is_legacy_token(self.legacy_token))
+        self.assertFalse(CredentialManager._is_legacy_token(self.current_token))
+        self.assertEqual(manager.get_credentials('openai').api_key, 'sk-legacy')
+        self.assertEqual(manager.get_credentials('google_gemini').api_key, 'sk-current')
+
+    def test_next_save_rewrites_legacy_token(self):
+        manager = CredentialManager(self.config_dir)
+        self.assertTrue(manager.save_credentials('ollama', {'endpoint': 'http://localhost:11434'}))
+
+        stored = self._stored(manager)
+        rewritten = stored['openai']['api_key']
+        self.assertNotEqual(rewritten, self.legacy_token)
+        self.assertTrue(rewritten.startswith(FERNET_TOKEN_PREFIX))
+        # Unchanged current-format values keep their ciphertext
+        self.assertEqual(stored['google_gemini']['api_key'], self.current_token)
+
+        reloaded = CredentialManager(self.config_dir)
+        self.assertEqual(reloaded.get_credentials('openai').api_key, 'sk-legacy')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Tests for text-based table of contents detection in DocumentExtractor.
+
+Run from the backend directory with: python -m unittest discover tests
+"""
+
+import os
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from document_extractor import DocumentExtractor
+    EXTRACTOR_AVAILABLE = True
+except ImportError:  # PyMuPDF or openpyxl not installed
+    EXTRACTOR_AVAILABLE = False
+
+
+# The per-line patterns _TOC_LINE_RE replaced, kept as the reference behavior
+_REFERENCE_TOC_LINE_PATTERNS = [
+    (re.compile(r'^((?:\d+\.)+\d*)\s+(.+?)[\s\.]{3,}(\d+)$'), 'numbered'),
+    (re.compile(r'^((?:\d+\.)+)\s+(.+?)[\s\.]{3,}(\d+)$'), 'numbered'),
+    (re.compile(r'^(Chapter|CHAPTER)\s+(\d+)[\s:\.]+(.+?)[\s\.]{3,}(\d+)$'), 'chapter'),
+    (re.compile(r'^([IVXLCDM]+\.?)\s+(.+?)[\s\.]{3,}(\d+)$'), 'roman'),
+    (re.compile(r'^(\d+)\s+(.+?)[\s\.]{3,}(\d+)$'), 'simple'),
+]
+
+
+def _reference_toc(extractor, pages):
+    """TOC entries as the previous line-by-line implementation built them."""
+    toc = []
+    for text in pages:
+        for line in text.split('\n'):
+            line = line.strip()
+            if not line or len(line) < 10:
+                continue
+            for pattern, pattern_type in _REFERENCE_TOC_LINE_PATTERNS:
+                match = pattern.match(line)
+                if not match:
+                    continue
+                groups = match.groups()
+                if pattern_type == 'numbered':
+                    toc.append({
+                        'level': extractor._calculate_hierarchy_level(groups[0]),
+                        'title': f"{groups[0]} {groups[1].strip()}",
+                        'page': int(groups[2]),
+                        'numbering': groups[0]
+                    })
+                elif pattern_type == 'chapter':
+                    toc.append({
+                        'level': 1,
+                        'title': f"{groups[0]} {groups[1]}: {groups[2]}",
+                        'page': int(groups[3]),
+                        'numbering': groups[1]
+                    })
+                else:
+                    numbering = groups[0].rstrip('.')
+                    toc.append({
+                        'level': 1,
+                        'title': f"{numbering}. {groups[1].strip()}",
+                        'page': int(groups[2]),
+                        'numbering': numbering
+                    })
+                break
+    return toc
+
+
+class _FakePage:
+    def __init__(self, text):
+        self._text = text
+
+    def get_text(self):
+        return self._text
+
+
+class _FakeDocument:
+    """Just enough of fitz.Document for _detect_toc_from_text."""
+
+    def __init__(self, pages):
+        self._pages = [_FakePage(text) for text in pages]
+        self.page_count = len(self._pages)
+
+    def __getitem__(self, page_num):
+        return self._pages[page_num]
+
+
+@unittest.skipUnless(EXTRACTOR_AVAILABLE, "document extraction dependencies are not installed")
+class TextTocDetectionTest(unittest.TestCase):
+    """The page-wide TOC regex must find the same entries as the per-line patterns did."""
+
+    PAGES = [
+        "Table of Contents\n"
+        "\n"
+        "1. Introduction ........................ 1\n"
+        "   1.1 Background ...................... 3\n"
+        "1.2.3 Deep Dive Into Details        12\n"
+        "2. Methods.............15\n"
+        "Chapter 3: Results .................. 20\n"
+        "CHAPTER 4 Discussion ..... 25\n"
+        "\tChapter 5. Outlook   ...   31\n",
+
+        "  IV. Appendix ........................ 40\n"
+        "XII Index . . . . . . . 99\n"
+        "7 Conclusion ........................ 50\n"
+        "\t  8 Indented Simple Entry ....... 61  \n"
+        "Short 1\n"
+        "A plain sentence that has no page number at all.\n"
+        "3.4 Title without leaders 7\n",
+    ]
+
+    def setUp(self):
+        self.extractor = DocumentExtractor()
+
+    def test_matches_reference_patterns(self):
+        expected = _reference_toc(self.extractor, self.PAGES)
+        actual = self.extractor._detect_toc_from_text(_FakeDocument(self.PAGES))
+
+        self.assertEqual(len(expected), 11)
+        self.assertEqual(actual, expected)
+
+    def test_entry_kinds(self):
+        toc = self.extractor._detect_toc_from_text(_FakeDocument(self.PAGES))
+        by_title = {entry['title']: entry for entry in toc}
+
+        self.assertEqual(by_title['1.1 Background']['level'], 2)
+        self.assertEqual(by_title['1.2.3 Deep Dive Into Details']['page'], 12)
+        self.assertEqual(by_title['Chapter 3: Results']['numbering'], '3')
+        self.assertEqual(by_title['IV. Appendix']['page'], 40)
+        self.assertEqual(by_title['8. Indented Simple Entry']['page'], 61)
+
+
+if __name__ == '__main__':
+    unittest.main()
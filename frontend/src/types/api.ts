@@ -101,6 +101,7 @@ export interface QuestionGenerationRequest {
   max_tokens?: number;
   top_p?: number;
   generation_mode?: GenerationMode; // Mode: 'qa_pair' (default) or 'question_only'
+  use_cache?: boolean; // Reuse stored pairs for identical requests (default true); false always calls the provider
 }
 
 // Question Generation Response